@@ -1,5 +1,6 @@
 from datetime import date
 from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import ORJSONResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 from app.db.session import get_db, get_sqlite
 from app.utils.user_utils import get_current_user
@@ -81,7 +82,9 @@ async def overview_chart(
             raise HTTPException(
                 status_code=404, detail="No data found for the specified date range."
             )    
-        return overview
+        # The charts are already JSON strings, encode the body once with orjson instead of
+        # validating and re-encoding them through the response model
+        return ORJSONResponse(overview)
     except Exception as e:
         raise HTTPException(
             status_code=500, detail=f"An error occurred: {str(e)}"
@@ -1,5 +1,6 @@
 import datetime
 from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import ORJSONResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 from app.db.session import get_db
 from app.utils.user_utils import get_current_user
@@ -38,7 +39,9 @@ async def retention(
             raise HTTPException(
                 status_code=404, detail="No data found for the specified date range."
             )    
-        return user_activity
+        # The charts are already JSON strings, encode the body once with orjson instead of
+        # validating and re-encoding them through the response model
+        return ORJSONResponse(user_activity)
     except Exception as e:
         raise HTTPException(
             status_code=500, detail=f"An error occurred: {str(e)}"
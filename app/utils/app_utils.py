@@ -1,3 +1,4 @@
+import asyncio
 import logging
 import secrets
 import time
@@ -17,6 +18,7 @@ from app.core.config import settings
 from app.db.session import sqlite_engine, get_sqlite
 from app.db.base import SqliteBase
 from app.db.models.user import LogData
+from app.utils.overview_utils import load_dau_mau_frames
 from app.api.v1.endpoint.auth import router as auth_router
 from app.api.v1.endpoint.revenue import router as revenue_router
 from app.api.v1.endpoint.chapter_all import router as chapter_router
@@ -105,7 +107,7 @@ class FastAPIApp:
         A context manager for handling startup and shutdown tasks for the FastAPI app.
 
         This method handles the following tasks:
-        - **Startup**: Initializes the database by creating the necessary tables.
+        - **Startup**: Initializes the database by creating the necessary tables and loads the DAU/MAU data into memory.
         - **Shutdown**: Disposes of the database connection after the application shuts down.
 
         It is invoked automatically by FastAPI when the app starts up and shuts down.
@@ -113,6 +115,7 @@ class FastAPIApp:
         print("Starting up...")
         async with sqlite_engine.begin() as conn:
             await conn.run_sync(SqliteBase.metadata.create_all)
+        await asyncio.to_thread(load_dau_mau_frames)
         yield
         print("Shutting down...")
         await sqlite_engine.dispose()
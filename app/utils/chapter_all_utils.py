@@ -1,7 +1,6 @@
 import pandas as pd
 import asyncio
 import json
-import plotly
 import plotly.graph_objects as go
 from typing import Dict
 from sqlalchemy.ext.asyncio import AsyncSession
@@ -14,6 +13,7 @@ from app.db.models.novel import GooddreamerNovel, GooddreamerNovelChapter, Goodd
 from app.db.models.novel import GooddreamerUserChapterAdmob, GooddreamerUserChapterProgression, DataCategory
 from app.db.models.user import GooddreamerUserWalletItem, GooddreamerUserData
 from app.db.models.data_source import ModelHasSources, Sources
+from app.utils.common_utils import figure_to_json
 pd.options.mode.copy_on_write = True
 
 
@@ -1226,7 +1226,7 @@ async def pembaca_pembeli_chapter_unique(
             fig.update_xaxes(title='Date', dtick='M1')
         
         # Convert figure to JSON
-        chart = await asyncio.to_thread(json.dumps, fig, cls=plotly.utils.PlotlyJSONEncoder)
+        chart = await asyncio.to_thread(figure_to_json, fig)
         
         return chart
     
@@ -1350,7 +1350,7 @@ async def chart_total_chapter_purchase(
             title=title[metrics_1]
         )  
 
-        chart = await asyncio.to_thread(json.dumps, fig, cls=plotly.utils.PlotlyJSONEncoder)
+        chart = await asyncio.to_thread(figure_to_json, fig)
         
         return chart
 
@@ -1420,7 +1420,7 @@ async def old_new_user_pembaca_chapter(chapter_read_data: dict) -> str:
     # Combine the traces and layout into a Figure object
     fig = go.Figure(data=[trace1, trace2], layout=layout)
 
-    chart = await asyncio.to_thread(json.dumps, fig, cls=plotly.utils.PlotlyJSONEncoder)
+    chart = await asyncio.to_thread(figure_to_json, fig)
 
     return chart
 
@@ -1492,7 +1492,7 @@ async def old_new_user_pembeli_chapter(
         fig = go.Figure(data=[trace1, trace2], layout=layout)
         
         # Convert figure to JSON
-        chart = await asyncio.to_thread(json.dumps, fig, cls=plotly.utils.PlotlyJSONEncoder)
+        chart = await asyncio.to_thread(figure_to_json, fig)
         
         return chart
     
@@ -1534,7 +1534,7 @@ async def pembaca_chapter_by_day(
         yaxis_title='Total Readers',
     )
 
-    chart = await asyncio.to_thread(json.dumps, fig, cls=plotly.utils.PlotlyJSONEncoder)
+    chart = await asyncio.to_thread(figure_to_json, fig)
 
     return chart
 
@@ -1585,7 +1585,7 @@ async def pembeli_chapter_by_day(
         fig.update_xaxes(title='Day')
         fig.update_yaxes(title='Total Purchase')
 
-        chart = await asyncio.to_thread(json.dumps, fig, cls=plotly.utils.PlotlyJSONEncoder)
+        chart = await asyncio.to_thread(figure_to_json, fig)
 
         return chart
 
@@ -1635,7 +1635,7 @@ async def pembaca_chapter_by_genre(chapter_read_data: dict):
         fig.update_xaxes(title='Genre')
         fig.update_yaxes(title='Percentage of Readers')
 
-        chart = await asyncio.to_thread(json.dumps, fig, cls=plotly.utils.PlotlyJSONEncoder)
+        chart = await asyncio.to_thread(figure_to_json, fig)
 
         return chart
 
@@ -1705,7 +1705,7 @@ async def pembeli_chapter_by_genre(
         fig.update_xaxes(title='Genre')
         fig.update_yaxes(title='Purchase Percentage')
 
-        chart = await asyncio.to_thread(json.dumps, fig, cls=plotly.utils.PlotlyJSONEncoder)
+        chart = await asyncio.to_thread(figure_to_json, fig)
 
         return chart
 
@@ -1822,7 +1822,7 @@ async def pembaca_chapter_table(
         fig.update_layout(title=title)
         
         # Convert figure to JSON
-        chart = await asyncio.to_thread(json.dumps, fig, cls=plotly.utils.PlotlyJSONEncoder)
+        chart = await asyncio.to_thread(figure_to_json, fig)
         
         return chart
     
@@ -2044,7 +2044,7 @@ async def user_activity(
     if df['date'].count() >= 31:
         fig.update_xaxes(title='Date', dtick='M1')
 
-    chart = await asyncio.to_thread(json.dumps, fig, cls=plotly.utils.PlotlyJSONEncoder)
+    chart = await asyncio.to_thread(figure_to_json, fig)
 
     return chart
 
@@ -1,8 +1,8 @@
 import pandas as pd
 import asyncio
 import json
-import plotly
 import plotly.graph_objects as go
+from app.utils.common_utils import figure_to_json
 
 
 def daily_growth(current_data: dict, last_week_data: dict):
@@ -92,7 +92,7 @@ async def chapter_old_new(data: pd.DataFrame, chapter_types: str):
 
         fig.update_xaxes(title='Date', dtick='D1')
         fig.update_yaxes(title='Total Users')
-        chart = await asyncio.to_thread(json.dumps, fig, cls=plotly.utils.PlotlyJSONEncoder)
+        chart = await asyncio.to_thread(figure_to_json, fig)
         return chart
 
     except Exception as e:
@@ -154,7 +154,7 @@ async def chapter_unique_count_chart(data: pd.DataFrame, chapter_types: str):
         fig.update_xaxes(title='Date', dtick='D1')
         fig.update_yaxes(title='Total Purchases')
 
-        chart = await asyncio.to_thread(json.dumps, fig, cls=plotly.utils.PlotlyJSONEncoder)
+        chart = await asyncio.to_thread(figure_to_json, fig)
         return chart
 
     except Exception as e:
@@ -195,7 +195,7 @@ async def chapter_coin_per_day(data: pd.DataFrame):
         fig.update_xaxes(title='Days')
         fig.update_yaxes(title='Total Purchases')  # Corrected title
 
-        chart = await asyncio.to_thread(json.dumps, fig, cls=plotly.utils.PlotlyJSONEncoder)
+        chart = await asyncio.to_thread(figure_to_json, fig)
         return chart
     
     except Exception as e:
@@ -241,7 +241,7 @@ async def chapter_coin_category(data: pd.DataFrame, top_n: int = 10):
         fig.update_xaxes(title='Genre')
         fig.update_yaxes(title='Percentage of Purchases')  # Corrected title
 
-        chart = await asyncio.to_thread(json.dumps, fig, cls=plotly.utils.PlotlyJSONEncoder)
+        chart = await asyncio.to_thread(figure_to_json, fig)
         return chart
     except Exception as e:
         return json.dumps({"error": str(e)})
@@ -322,7 +322,7 @@ async def chapter_table(
             title="Chapter Purchase Details by Novel Title"
         )  # More descriptive title
 
-        chart = await asyncio.to_thread(json.dumps, fig, cls=plotly.utils.PlotlyJSONEncoder)
+        chart = await asyncio.to_thread(figure_to_json, fig)
         return chart
     except Exception as e:
         return json.dumps({"error": str(e)})
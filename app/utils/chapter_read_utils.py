@@ -1,6 +1,5 @@
 import pandas as pd
 import asyncio
-import plotly
 import json
 import plotly.graph_objects as go
 from datetime import datetime, timedelta
@@ -8,6 +7,7 @@ from sqlalchemy import select, func, case
 from sqlalchemy.ext.asyncio import AsyncSession
 from app.db.models.novel import GooddreamerNovelChapter, GooddreamerNovel
 from app.db.models.novel import GooddreamerUserChapterProgression
+from app.utils.common_utils import figure_to_json
 
 
 async def chapter_read_frequency(
@@ -128,7 +128,7 @@ async def chapter_read_frequency(
         )
         fig.update_layout(title="Chapter Reader Frequency Distribution Table")
 
-    chart = await asyncio.to_thread(json.dumps, fig, cls=plotly.utils.PlotlyJSONEncoder)
+    chart = await asyncio.to_thread(figure_to_json, fig)
 
     return chart
 
@@ -192,7 +192,7 @@ async def chapter_read_old_new(data: pd.DataFrame):
 
         fig.update_xaxes(title='Date', dtick='D1')
         # fig.update_yaxes(title='Total Users')
-        chart = await asyncio.to_thread(json.dumps, fig, cls=plotly.utils.PlotlyJSONEncoder)
+        chart = await asyncio.to_thread(figure_to_json, fig)
         return chart
 
     except Exception as e:
@@ -251,7 +251,7 @@ async def chapter_read_unique_count_chart(data: pd.DataFrame):
         fig.update_xaxes(title='Date', dtick='D1')
         fig.update_yaxes(title='Total Purchases')
 
-        chart = await asyncio.to_thread(json.dumps, fig, cls=plotly.utils.PlotlyJSONEncoder)
+        chart = await asyncio.to_thread(figure_to_json, fig)
         return chart
 
     except Exception as e:
@@ -292,7 +292,7 @@ async def chapter_read_per_day(data: pd.DataFrame):
         fig.update_xaxes(title='Days')
         fig.update_yaxes(title='Total Reader')  # Corrected title
 
-        chart = await asyncio.to_thread(json.dumps, fig, cls=plotly.utils.PlotlyJSONEncoder)
+        chart = await asyncio.to_thread(figure_to_json, fig)
         return chart
     
     except Exception as e:
@@ -338,7 +338,7 @@ async def chapter_read_category(data: pd.DataFrame, top_n: int = 10):
         fig.update_xaxes(title='Genre')
         fig.update_yaxes(title='Percentage of Reader')  # Corrected title
 
-        chart = await asyncio.to_thread(json.dumps, fig, cls=plotly.utils.PlotlyJSONEncoder)
+        chart = await asyncio.to_thread(figure_to_json, fig)
         return chart
     except Exception as e:
         return json.dumps({"error": str(e)})
@@ -409,7 +409,7 @@ async def chapter_read_table(
             title="Chapter Reader Details by Novel Title"
         )  # More descriptive title
 
-        chart = await asyncio.to_thread(json.dumps, fig, cls=plotly.utils.PlotlyJSONEncoder)
+        chart = await asyncio.to_thread(figure_to_json, fig)
         return chart
     except Exception as e:
         return json.dumps({"error": str(e)})
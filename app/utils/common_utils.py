@@ -0,0 +1,132 @@
+"""helpers shared by the utils modules"""
+import asyncio
+import time
+import orjson
+import numpy as np
+import pandas as pd
+import plotly
+import plotly.graph_objects as go
+from collections import OrderedDict
+from typing import Dict
+
+# Shared encoder whose `default` covers the types orjson does not serialize natively
+_PLOTLY_ENCODER = plotly.utils.PlotlyJSONEncoder()
+
+
+def figure_to_json(fig) -> str:
+    """
+    Serialize a Plotly figure to JSON with orjson.
+
+    A go.Figure is converted to a plain dict once via `to_plotly_json`, numpy arrays and dates are
+    encoded natively in C, and any value orjson cannot encode (Decimal, pandas Timestamp, object
+    arrays, ...) falls back to `PlotlyJSONEncoder`.
+
+    Args:
+        fig (go.Figure | dict): The figure, or an already plain figure dict, to serialize.
+
+    Returns:
+        str: The JSON representation of the figure.
+    """
+    return orjson.dumps(
+        fig.to_plotly_json() if isinstance(fig, go.Figure) else fig,
+        default=_PLOTLY_ENCODER.default,
+        option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+    ).decode()
+
+
+def thousands_formatter(values, prefix: str = "") -> np.ndarray:
+    """
+    Format numerical values as chart text with commas as thousands separators and no decimal places.
+
+    Vectorized equivalent of `values.apply(lambda x: prefix + "{:,.0f}".format(x))`: the values are rounded
+    to integers, stringified and grouped with a single regex pass; only non-finite values (nan/inf) go
+    through `format`.
+
+    Args:
+        values (array-like): The numerical values to be formatted.
+        prefix (str, optional): A prefix added to every value, e.g. "Rp. ". Defaults to "".
+
+    Returns:
+        numpy.ndarray: The formatted values as an object array.
+    """
+    values = np.asarray(values, dtype=np.float64)
+    finite = np.isfinite(values)
+    integers = np.rint(np.where(finite, values, 0)).astype(np.int64)
+    text = pd.Series(integers).astype(str).str.replace(r"(?<=\d)(?=(\d{3})+$)", ",", regex=True).to_numpy(dtype=object)
+    if not finite.all():
+        text[~finite] = [f"{value:,.0f}" for value in values[~finite].tolist()]
+    return prefix + text if prefix else text
+
+
+def calculate_growth_percentage(current_data: Dict[str, float], last_week_data: Dict[str, float]) -> Dict[str, float]:
+    """
+    Compute the growth of every metric against the previous period in one vectorized pass,
+    0 where the previous value is 0.
+
+    Args:
+        current_data (dict): The metrics of the current period.
+        last_week_data (dict): The same metrics of the previous period.
+
+    Returns:
+        dict: The growth of each metric rounded to 4 decimals, in the order of `current_data`.
+    """
+    keys = list(current_data)
+    new = np.array([current_data[key] for key in keys], dtype=np.float64)
+    old = np.array([last_week_data[key] for key in keys], dtype=np.float64)
+    percentage = np.divide(new - old, old, out=np.zeros_like(new), where=old != 0)
+    return dict(zip(keys, np.round(percentage, 4).tolist()))
+
+
+class SingleFlightCache:
+    """
+    LRU cache whose entries expire after `ttl` seconds and whose misses are built only once.
+
+    Concurrent callers of the same key wait on a per-key lock instead of building the value again. The
+    lock only lives while a coroutine holds or waits on it, so failed or one-off keys don't pile up and a
+    waited-on lock is never replaced by a new one.
+    """
+
+    def __init__(self, maxsize: int, ttl: float):
+        """
+        Args:
+            maxsize (int): The maximum number of cached values, the least recently used is evicted first.
+            ttl (float): The number of seconds a cached value is served before it is built again.
+        """
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._values = OrderedDict()
+        # In-flight keys only, each maps to [lock, coroutines holding or waiting on it]
+        self._locks = {}
+
+    async def get(self, key, build):
+        """
+        Return the value cached under `key`, building it with `build` when missing or expired.
+
+        Args:
+            key (hashable): The cache key, every argument the value depends on.
+            build (callable): A coroutine function without arguments that builds the value.
+
+        Returns:
+            The cached or freshly built value.
+        """
+        entry = self._locks.setdefault(key, [asyncio.Lock(), 0])
+        entry[1] += 1
+
+        try:
+            async with entry[0]:
+                cached = self._values.get(key)
+                if cached is not None and time.monotonic() - cached[0] < self.ttl:
+                    self._values.move_to_end(key)
+                    return cached[1]
+
+                value = await build()
+                self._values[key] = (time.monotonic(), value)
+                self._values.move_to_end(key)
+
+                while len(self._values) > self.maxsize:
+                    self._values.popitem(last=False)
+                return value
+        finally:
+            entry[1] -= 1
+            if entry[1] == 0:
+                del self._locks[key]
@@ -1,6 +1,4 @@
 import pandas as pd
-import plotly
-import json
 import asyncio
 from datetime import datetime, timedelta
 import plotly.graph_objects as go
@@ -11,6 +9,7 @@ from app.db.models.acquisition import Ga4EventData
 from app.db.models.user import Codes as c, CodeRedeem as cr, Illustrations as i 
 from app.db.models.user import IllustrationTransaction as it, GooddreamerUserData as gud
 from app.db.models.data_source import ModelHasSources as mhs, Sources as s
+from app.utils.common_utils import figure_to_json
 
 
 class RedeemCode:
@@ -363,7 +362,7 @@ class RedeemCode:
                 )
             )
             fig.update_layout(title='Redeemed Code Details')   
-            chart = await asyncio.to_thread(json.dumps, fig, cls=plotly.utils.PlotlyJSONEncoder)
+            chart = await asyncio.to_thread(figure_to_json, fig)
         elif types == 'redeemed_code':
             df = await self.redeemed_details(types=types, from_date=from_date, to_date=to_date, data="df", codes=codes, user_type=user_type)
             print(df)
@@ -404,7 +403,7 @@ class RedeemCode:
                 )
             )
             fig.update_layout(title='Redeemed Code Details')
-            chart = await asyncio.to_thread(json.dumps, fig, cls=plotly.utils.PlotlyJSONEncoder)
+            chart = await asyncio.to_thread(figure_to_json, fig)
 
         return chart
 
@@ -740,7 +739,7 @@ class TransactionIllustration:
                 )
             )
             fig.update_layout(title="Overall Illustration Transaction")
-            chart = await asyncio.to_thread(json.dumps, fig, cls=plotly.utils.PlotlyJSONEncoder)
+            chart = await asyncio.to_thread(figure_to_json, fig)
 
         elif types == 'illustration_details':
             df = await self.transaction_details(types=types, data="df", from_date=from_date, to_date=to_date, source=source, novel_title=novel_title, illustration_id=illustration_id)
@@ -777,7 +776,7 @@ class TransactionIllustration:
                 )
             )
             fig.update_layout(title="Illustration Transaction Details")
-            chart = await asyncio.to_thread(json.dumps, fig, cls=plotly.utils.PlotlyJSONEncoder)
+            chart = await asyncio.to_thread(figure_to_json, fig)
 
         return chart
 
@@ -970,6 +969,6 @@ class GoogleEventData:
         fig.update_xaxes(title='Period', dtick='D1')
         fig.update_yaxes(title='Value')
 
-        chart = await asyncio.to_thread(json.dumps, fig, cls=plotly.utils.PlotlyJSONEncoder)
+        chart = await asyncio.to_thread(figure_to_json, fig)
 
         return chart
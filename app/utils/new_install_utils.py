@@ -1,13 +1,12 @@
 """function file new install"""
 import pandas as pd
 from datetime import datetime, timedelta
-import json
-import plotly
 import asyncio
 from sqlalchemy.ext.asyncio import AsyncSession
 import plotly.graph_objects as go
 from sqlalchemy import func, select
 from app.db.models.acquisition import GoogleAdsData, FacebookAdsData, TiktokAdsData, AsaData, Currency
+from app.utils.common_utils import figure_to_json
 
 
 class InstallData:
@@ -634,7 +633,7 @@ class InstallData:
         fig.update_layout(title='Install Source')
 
         # Convert the figure to JSON
-        chart = await asyncio.to_thread(lambda: json.dumps(fig, cls=plotly.utils.PlotlyJSONEncoder))
+        chart = await asyncio.to_thread(figure_to_json, fig)
 
         return chart
 
@@ -662,7 +661,7 @@ class InstallData:
         fig.update_layout(title='New Install Source')
 
         # Convert the figure to JSON
-        chart = await asyncio.to_thread(json.dumps, fig, cls=plotly.utils.PlotlyJSONEncoder)
+        chart = await asyncio.to_thread(figure_to_json, fig)
 
         return chart
     
@@ -695,7 +694,7 @@ class InstallData:
         fig.update_xaxes(title='Date', dtick='D1')
         fig.update_yaxes(title='Total Install')
 
-        chart = await asyncio.to_thread(json.dumps, fig, cls=plotly.utils.PlotlyJSONEncoder)
+        chart = await asyncio.to_thread(figure_to_json, fig)
 
         return chart
 
@@ -1128,7 +1127,7 @@ async def cost_install_chart(data: dict):
     fig.update_xaxes(title='Date')
 
     # Convert the Figure object to a JSON representation for Plotly
-    chart = await asyncio.to_thread(json.dumps, fig, cls=plotly.utils.PlotlyJSONEncoder)
+    chart = await asyncio.to_thread(figure_to_json, fig)
 
     return chart
 
@@ -1163,7 +1162,7 @@ async def ads_install_chart(data: dict):
     fig.update_yaxes(title='Total Install')
 
     # Convert the Figure object to a JSON representation for Plotly
-    chart = await asyncio.to_thread(json.dumps, fig, cls=plotly.utils.PlotlyJSONEncoder)
+    chart = await asyncio.to_thread(figure_to_json, fig)
 
     return chart
 
@@ -1208,7 +1207,7 @@ async def campaign_details_table(data: dict):
     fig.update_layout(title='Ads Campaign Details')
     
     # Convert the Figure object to a JSON representation for Plotly
-    chart = await asyncio.to_thread(json.dumps, fig, cls=plotly.utils.PlotlyJSONEncoder)
+    chart = await asyncio.to_thread(figure_to_json, fig)
 
     return chart
 
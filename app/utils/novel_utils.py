@@ -2,15 +2,35 @@
 import pandas as pd
 import numpy as np
 import json
-import plotly
 import asyncio
 import plotly.graph_objects as go
 from datetime import datetime
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import Case, select,case, func
+from sqlalchemy import Case, select, func, literal, union_all
+from app.db.session import async_session_maker
 from app.db.models.novel import GooddreamerNovel, DataCategory, GooddreamerNovelChapter, GooddreamerUserChapterProgression
 from app.db.models.novel import  GooddreamerChapterTransaction, GooddreamerUserChapterAdmob, GooddreamerUserFavorite
 from app.db.models.user import GooddreamerUserData, GooddreamerUserWalletItem
+from app.utils.common_utils import SingleFlightCache, figure_to_json, thousands_formatter
+
+# Base table trace shared by the NovelDetails tables, only the values change per render
+_TABLE_TEMPLATE = {
+    "type": "table",
+    "header": {"fill": {"color": "grey"}, "line": {"color": "black"}, "font": {"color": "black"}, "align": "center"},
+    "cells": {"fill": {"color": "white"}, "line": {"color": "black"}, "font": {"color": "black"}, "align": "center"},
+}
+
+# Chapter ranges of the reader frequency distribution: (lo, hi, order, label)
+_FREQUENCY_BUCKETS = [
+    (1, 5, 1, '1-5'),
+    (6, 10, 2, '6-10'),
+    (11, 20, 3, '11-20'),
+    (21, 50, 4, '21-50'),
+    (51, 2147483647, 5, '> 51'),
+]
+
+# Cache of NovelDetails frames keyed by (novel_title, from_date, to_date, data)
+_novel_cache = SingleFlightCache(maxsize=128, ttl=300)
 
 
 async def novel_dataframe(
@@ -258,7 +278,7 @@ async def novel_table(
             layout=dict(height=1500)
         )
 
-        return await asyncio.to_thread(json.dumps, fig, cls=plotly.utils.PlotlyJSONEncoder)
+        return await asyncio.to_thread(figure_to_json, fig)
 
     except Exception as e:  # Catching general errors
         return json.dumps({'error': f'An error occurred while generating the table, {e}'})
@@ -288,6 +308,24 @@ def str_converter(text, types='txt'):
         return text
 
 
+def table_figure(df: pd.DataFrame, title: str, **trace) -> dict:
+    """
+    Build a Plotly table figure dict from `_TABLE_TEMPLATE`, skipping graph_objects validation.
+
+    Args:
+        df (pd.DataFrame): The data to display, one table column per DataFrame column.
+        title (str): The figure title.
+        **trace: Extra table trace properties (e.g. columnwidth).
+
+    Returns:
+        dict: The figure, ready for `figure_to_json`.
+    """
+    table = {**_TABLE_TEMPLATE, **trace}
+    table["header"] = {**_TABLE_TEMPLATE["header"], "values": list(df.columns)}
+    table["cells"] = {**_TABLE_TEMPLATE["cells"], "values": df.to_numpy().T.tolist()}
+    return {"data": [table], "layout": {"title": {"text": title}}}
+
+
 class NovelDetails:
     """
     Fetches and stores detailed information about a specific novel 
@@ -326,13 +364,23 @@ class NovelDetails:
         self.to_date = to_date
         self.novel_title = novel_title
         self.df_novel_details = pd.DataFrame()
-        self.df_novel_favorite = pd.DataFrame()
+        self.novel_favorite = {}
         self.df_reader = pd.DataFrame()
         self.df_chapter_coin = pd.DataFrame()
         self.df_chapter_adscoin = pd.DataFrame()
         self.df_chapter_ads = pd.DataFrame()
         self.df_frequency = pd.DataFrame()
 
+    _DATA_ATTRS = {
+        "novel_details": "df_novel_details",
+        "novel_favorite": "novel_favorite",
+        "novel_reader": "df_reader",
+        "novel_purchase_coin": "df_chapter_coin",
+        "novel_purchase_adscoin": "df_chapter_adscoin",
+        "novel_purchase_ads": "df_chapter_ads",
+        "reader_frequency": "df_frequency",
+    }
+
     @classmethod
     async def laod_data(cls, session: AsyncSession, novel_title: str, from_date: datetime.date, to_date: datetime.date):
         """
@@ -350,17 +398,69 @@ class NovelDetails:
             - User purchases (coins and ads coins) for chapters
             - Reader frequency by chapter range
 
-        This method calls the individual `_read_db` methods to populate the corresponding DataFrames within the object.
+        The small reads (details, favorites, reader frequency) run one after another on `self.session`,
+        while the large reader and purchase reads are split over two extra sessions from
+        `async_session_maker` (an AsyncSession is not safe for concurrent use), so a request holds at
+        most three pooled connections instead of one per read.
+        """
+        async def read_sequentially(session: AsyncSession, datas: tuple):
+            for data in datas:
+                await self._read_db(data=data, session=session)
+
+        async def read_with_own_session(datas: tuple):
+            async with async_session_maker() as session:
+                await read_sequentially(session, datas)
+
+        await asyncio.gather(
+            read_sequentially(self.session, ("novel_details", "novel_favorite", "reader_frequency")),
+            read_with_own_session(("novel_reader", "novel_purchase_coin")),
+            read_with_own_session(("novel_purchase_adscoin", "novel_purchase_ads"))
+        )
+
+    async def _read_db(self, data: str, session: AsyncSession = None):
         """
-        await self._read_db(data="novel_details")
-        await self._read_db(data="novel_favorite")
-        await self._read_db(data="novel_reader")
-        await self._read_db(data="novel_purchase_coin")
-        await self._read_db(data="novel_purchase_adscoin")
-        await self._read_db(data="novel_purchase_ads")
-        await self._read_db(data="reader_frequency")
-
-    async def _read_db(self, data: str):
+        Populates the DataFrame for `data`, replaying it from the module cache when the same
+        (novel_title, from_date, to_date, data) was queried within the last `_novel_cache.ttl` seconds.
+
+        Parameters:
+            data (str): The data to fetch, see `_query_db`.
+            session (AsyncSession, optional): Session to query with. Defaults to `self.session`.
+        """
+        attr = self._DATA_ATTRS[data]
+        key = (self.novel_title, self.from_date, self.to_date, data)
+
+        async def build():
+            await self._query_db(data, session or self.session)
+            return getattr(self, attr)
+
+        setattr(self, attr, await _novel_cache.get(key, build))
+
+    @staticmethod
+    async def _stream_frame(session: AsyncSession, query, chunk_size: int = 10_000) -> pd.DataFrame:
+        """
+        Executes `query` on a server-side cursor and builds the DataFrame chunk by chunk,
+        so the full row set is never held in memory alongside the frame.
+
+        Parameters:
+            session (AsyncSession): The session to run the query on.
+            query: The SQLAlchemy select to execute.
+            chunk_size (int, optional): Rows fetched per round-trip. Defaults to 10,000.
+
+        Returns:
+            pd.DataFrame: The query result, empty (with its columns) if no rows matched.
+        """
+        result = await session.stream(query.execution_options(yield_per=chunk_size))
+        columns = list(result.keys())
+        chunks = [
+            pd.DataFrame.from_records(batch, columns=columns)
+            async for batch in result.mappings().partitions()
+        ]
+
+        if not chunks:
+            return pd.DataFrame(columns=columns)
+        return pd.concat(chunks, ignore_index=True)
+
+    async def _query_db(self, data: str, session: AsyncSession):
         """
         Reads detailed information about the specified novel from the database.
 
@@ -390,6 +490,7 @@ class NovelDetails:
                 - 'novel_purchase_adscoin'
                 - 'novel_purchase_ads'
                 - 'reader_frequency' 
+            session (AsyncSession): The session to run the queries on.
 
         The method handles potential empty results and merges data from different sources
         (novel details, author information) into a single DataFrame.
@@ -409,7 +510,7 @@ class NovelDetails:
             ).join(
                 GooddreamerNovel.data_category
             ).filter(
-                GooddreamerNovel.novel_title.like(f"{self.novel_title}"),
+                GooddreamerNovel.novel_title == self.novel_title,
                 GooddreamerNovel.status == 2,
                 GooddreamerNovel.deleted_at.is_(None),
                 GooddreamerNovelChapter.status == 1,
@@ -417,11 +518,11 @@ class NovelDetails:
             ).group_by(
                 GooddreamerNovel.id
             )
-            result = await self.session.execute(query)
-            result_data = result.fetchall()
-            df_novel = pd.DataFrame(result_data)
+            result = await session.execute(query)
+            rows = result.mappings().all()
+            df_novel = pd.DataFrame.from_records(rows, columns=list(result.keys()))
 
-            if df_novel.empty:
+            if not rows:
                 df_novel = pd.DataFrame({
                     "id_novel": [0],
                     "novel_title": ["-"],
@@ -438,32 +539,32 @@ class NovelDetails:
             ).join(
                 GooddreamerNovel.gooddreamer_novel_chapter
             ).filter(
-                GooddreamerNovel.novel_title.like(f"{self.novel_title}"),
+                GooddreamerNovel.novel_title == self.novel_title,
                 GooddreamerNovel.status == 2,
                 GooddreamerNovel.deleted_at.is_(None),
                 GooddreamerNovelChapter.deleted_at.is_(None),
                 GooddreamerNovelChapter.status != 1
             ).group_by("id_novel")
-            unpublised_result = await self.session.execute(unpublised_query)
-            unpublished_data = unpublised_result.fetchall()
-            df_unpublished = pd.DataFrame(unpublished_data)
+            unpublised_result = await session.execute(unpublised_query)
+            unpublished_rows = unpublised_result.mappings().all()
+            df_unpublished = pd.DataFrame.from_records(unpublished_rows, columns=list(unpublised_result.keys()))
 
-            if df_unpublished.empty:
+            if not unpublished_rows:
                 df_unpublished = pd.DataFrame({
                     "id_novel": df_novel["id_novel"].item(),
                     "bab_belum_terbit": [0]
                 })
             
-            df_merged = await asyncio.to_thread(lambda: pd.merge(df_novel, df_unpublished, on="id_novel", how="inner"))
-            df_merged["bab_terbit"] = await asyncio.to_thread(lambda: df_merged["total_bab"] - df_merged["bab_belum_terbit"])
+            df_merged = pd.merge(df_novel, df_unpublished, on="id_novel", how="inner")
+            df_merged["bab_terbit"] = df_merged["total_bab"] - df_merged["bab_belum_terbit"]
 
             # Read data penulis
-            df_penulis = pd.read_csv('./csv/data_penulis.csv')
-            await asyncio.to_thread(lambda: df_penulis.rename(columns={"ID_Novel": "id_novel", "Alamat ": "Alamat"}, inplace=True))
-            df_penulis = await asyncio.to_thread(lambda: df_penulis.loc[:, ["id_novel","Nama Penulis", "Nama Pena", "Gender", "WA", "Email Penulis", "Alamat"]])
+            df_penulis = await asyncio.to_thread(pd.read_csv, './csv/data_penulis.csv')
+            df_penulis = df_penulis.rename(columns={"ID_Novel": "id_novel", "Alamat ": "Alamat"})
+            df_penulis = df_penulis.loc[:, ["id_novel","Nama Penulis", "Nama Pena", "Gender", "WA", "Email Penulis", "Alamat"]]
 
             # merge data novel & data penulis
-            df = await asyncio.to_thread(lambda: pd.merge(df_merged, df_penulis, on="id_novel", how="inner"))
+            df = pd.merge(df_merged, df_penulis, on="id_novel", how="inner")
 
             if df.empty:
                 df = pd.DataFrame({
@@ -484,7 +585,7 @@ class NovelDetails:
                     "Alamat": ["-"]
                 })
             
-            self.df_novel_details = df.copy()
+            self.df_novel_details = df
         
         elif data == "novel_favorite":
             query = select(
@@ -493,19 +594,11 @@ class NovelDetails:
             ).join(
                 GooddreamerUserFavorite.gooddreamer_novel
             ).filter(
-                GooddreamerNovel.novel_title.like(f"{self.novel_title}")
+                GooddreamerNovel.novel_title == self.novel_title
             ).group_by(GooddreamerUserFavorite.novel_id)
-            result = await self.session.execute(query)
-            result_data = result.fetchall()
-            df = pd.DataFrame(result_data)
-
-            if df.empty:
-                df = pd.DataFrame({
-                    "id_novel": [0],
-                    "total_favorite": [0]
-                })
-
-            self.df_novel_favorite = df.copy()
+            result = await session.execute(query)
+            row = result.mappings().first()
+            self.novel_favorite = dict(row) if row else {"id_novel": 0, "total_favorite": 0}
 
         elif data == "novel_reader":
             query = select(
@@ -523,15 +616,13 @@ class NovelDetails:
             ).join(
                 GooddreamerNovelChapter.gooddreamer_novel
             ).filter(
-                GooddreamerNovel.novel_title.like(f"{self.novel_title}"),
+                GooddreamerNovel.novel_title == self.novel_title,
                 func.date(GooddreamerUserChapterProgression.updated_at).between(self.from_date, self.to_date)
             ).group_by(
                 GooddreamerUserChapterProgression.user_id,
                 GooddreamerNovel.novel_title
             )
-            result = await self.session.execute(query)
-            result_data = result.fetchall()
-            df = pd.DataFrame(result_data)
+            df = await self._stream_frame(session, query)
 
             if df.empty:
                 df = pd.DataFrame({
@@ -544,8 +635,8 @@ class NovelDetails:
                     "last_read_date": ["-"]
                 })
 
-            await asyncio.to_thread(lambda: df.fillna({"email": "guest"}, inplace=True))
-            self.df_reader = df.copy()
+            df = df.fillna({"email": "guest"})
+            self.df_reader = df
         
         elif data == "novel_purchase_coin":
             query = select(
@@ -565,15 +656,13 @@ class NovelDetails:
             ).filter(
                 GooddreamerUserWalletItem.reffable_type == "App\\Models\\ChapterTransaction",
                 GooddreamerUserWalletItem.coin_type == "coin",
-                GooddreamerNovel.novel_title.like(f"{self.novel_title}"),
+                GooddreamerNovel.novel_title == self.novel_title,
                 func.date(GooddreamerChapterTransaction.created_at).between(self.from_date, self.to_date)
             ).group_by(
                 GooddreamerChapterTransaction.user_id,
                 GooddreamerNovel.novel_title
             )
-            result = await self.session.execute(query)
-            result_data = result.fetchall()
-            df = pd.DataFrame(result_data)
+            df = await self._stream_frame(session, query)
 
             if df.empty:
                 df = pd.DataFrame({
@@ -586,7 +675,7 @@ class NovelDetails:
                     "last_purchase_date": ["-"]
                 })
 
-            self.df_chapter_coin = df.copy()
+            self.df_chapter_coin = df
         
         elif data == "novel_purchase_adscoin":
             query = select(
@@ -606,15 +695,13 @@ class NovelDetails:
             ).filter(
                 GooddreamerUserWalletItem.reffable_type == "App\\Models\\ChapterTransaction",
                 GooddreamerUserWalletItem.coin_type == "ads-coin",
-                GooddreamerNovel.novel_title.like(f"{self.novel_title}"),
+                GooddreamerNovel.novel_title == self.novel_title,
                 func.date(GooddreamerChapterTransaction.created_at).between(self.from_date, self.to_date)
             ).group_by(
                 GooddreamerChapterTransaction.user_id,
                 GooddreamerNovel.novel_title
             )
-            result = await self.session.execute(query)
-            result_data = result.fetchall()
-            df = pd.DataFrame(result_data)
+            df = await self._stream_frame(session, query)
 
             if df.empty:
                 df = pd.DataFrame({
@@ -627,7 +714,7 @@ class NovelDetails:
                     "last_purchase_date": ["-"]
                 })
 
-            self.df_chapter_adscoin = df.copy()
+            self.df_chapter_adscoin = df
 
         elif data == "novel_purchase_ads":
             query = select(
@@ -645,15 +732,13 @@ class NovelDetails:
             ).join(
                 GooddreamerNovelChapter.gooddreamer_novel
             ).filter(
-                GooddreamerNovel.novel_title.like(f"{self.novel_title}"),
+                GooddreamerNovel.novel_title == self.novel_title,
                 func.date(GooddreamerUserChapterAdmob.created_at).between(self.from_date, self.to_date)
             ).group_by(
                 GooddreamerUserChapterAdmob.user_id,
                 GooddreamerNovel.novel_title
             )
-            result = await self.session.execute(query)
-            result_data = result.fetchall()
-            df = pd.DataFrame(result_data)
+            df = await self._stream_frame(session, query)
 
             if df.empty:
                 df = pd.DataFrame({
@@ -666,72 +751,69 @@ class NovelDetails:
                     "last_purchase_date": ["-"]
                 })
 
-            self.df_chapter_ads = df.copy()
+            self.df_chapter_ads = df
 
         elif data == "reader_frequency":
-            freq_cte = (
+            # Resolve each chapter's bucket by joining a small range table instead of
+            # evaluating CASE predicates per row
+            bucket_map = union_all(*(
                 select(
-                    GooddreamerNovelChapter.novel_id,
-                    GooddreamerNovelChapter.sort.label('bab'),
-                    func.count(GooddreamerUserChapterProgression.user_id.distinct()).label("total_pembaca")
+                    literal(lo).label("lo"),
+                    literal(hi).label("hi"),
+                    literal(order).label("order"),
+                    literal(label).label("bab")
+                )
+                for lo, hi, order, label in _FREQUENCY_BUCKETS
+            )).subquery("bucket_map")
+
+            # De-duplicate (chapter, reader) pairs first and count rows outside, which lets the
+            # database use a hash distinct instead of a per-group sort for COUNT(DISTINCT). The
+            # chapter stays in the pairs so a bucket counts every chapter's readers, not its users
+            bucket_readers = (
+                select(
+                    GooddreamerNovelChapter.novel_id.label("novel_id"),
+                    bucket_map.c.order,
+                    bucket_map.c.bab,
+                    GooddreamerNovelChapter.sort.label("sort"),
+                    GooddreamerUserChapterProgression.user_id.label("user_id")
                 )
                 .join(GooddreamerUserChapterProgression.gooddreamer_novel_chapter)
                 .join(GooddreamerNovelChapter.gooddreamer_novel)
+                .join(bucket_map, GooddreamerNovelChapter.sort.between(bucket_map.c.lo, bucket_map.c.hi))
                 .filter(
                     func.date(GooddreamerUserChapterProgression.updated_at).between(self.from_date, self.to_date),
-                    GooddreamerNovel.novel_title.like(f"{self.novel_title}")
+                    GooddreamerNovel.novel_title == self.novel_title
                     )
-                .group_by(
-                    GooddreamerNovelChapter.novel_id,
-                    GooddreamerNovelChapter.sort
-                )
-                .cte("freq")
+                .distinct()
+                .subquery()
             )
 
-            # Step 2: Define the 'main_query' CTE
-            order_case = case(
-                (freq_cte.c.bab.between(1, 5), 1),
-                (freq_cte.c.bab.between(6, 10), 2),
-                (freq_cte.c.bab.between(11, 20), 3),
-                (freq_cte.c.bab.between(21, 50), 4),
-                (freq_cte.c.bab >= 51, 5),
-                else_=None
-            ).label("order")
-
-            bab_case = case(
-                (freq_cte.c.bab.between(1, 5), '1-5'),
-                (freq_cte.c.bab.between(6, 10), '6-10'),
-                (freq_cte.c.bab.between(11, 20), '11-20'),
-                (freq_cte.c.bab.between(21, 50), '21-50'),
-                (freq_cte.c.bab >= 51, '> 51'),
-                else_=None
-            ).label("bab")
-
-            total_pembaca = func.sum(freq_cte.c.total_pembaca).label("total_pembaca")
-
-            # Step 3: Build the final query using the 'main_query' CTE
             main_query = (
                 select(
-                    freq_cte.c.novel_id.label("novel_id"),
-                    order_case.label("order"),
-                    bab_case.label("bab"),
-                    total_pembaca.label("total_pembaca")
+                    bucket_readers.c.novel_id,
+                    bucket_readers.c.order,
+                    bucket_readers.c.bab,
+                    func.count().label("total_pembaca")
                 )
-                .group_by(freq_cte.c.novel_id, order_case, bab_case)
+                .group_by(bucket_readers.c.novel_id, bucket_readers.c.order, bucket_readers.c.bab)
             )
 
-            # Step 4: Execute the query
-            result = await self.session.execute(main_query)
-            result_data = result.fetchall()
-            df = pd.DataFrame(result_data)
-            if df.empty:
+            # Execute the query
+            result = await session.execute(main_query)
+            rows = result.mappings().all()
+            df = pd.DataFrame.from_records(rows, columns=list(result.keys()))
+            if not rows:
                 df = pd.DataFrame({
                     "novel_id": [0],
                     "order": [0],
                     "bab": ["-"],
                     "total_pembaca": [0]
                 })
-            self.df_frequency = df.copy()
+
+            # Sort and format once so frequency_dataframe can read the frame without copying
+            df = df.take(np.argsort(df["order"].values, kind="stable"))
+            df["total_pembaca_text"] = thousands_formatter(df["total_pembaca"])
+            self.df_frequency = df
 
     async def novel_details(self):
         """
@@ -745,80 +827,59 @@ class NovelDetails:
         Returns:
             dict: A dictionary containing the calculated metrics for the novel.
         """
-        df_novel_details = self.df_novel_details
-        df_novel_favorite = self.df_novel_favorite
+        novel = self.df_novel_details.to_dict("records")[0]
+        novel_favorite = self.novel_favorite
         df_reader = self.df_reader
         df_chapter_coin = self.df_chapter_coin
         df_chapter_adscoin = self.df_chapter_adscoin
         df_chapter_ads = self.df_chapter_ads
 
-        df_reader_guest = await asyncio.to_thread(lambda: df_reader[df_reader["email"] == "guest"])
-        df_reader_register = await asyncio.to_thread(lambda: df_reader[df_reader["email"] != "guest"])
-
-        metrics = await asyncio.gather(
-            asyncio.to_thread(lambda: df_novel_details["id_novel"].item()),
-            asyncio.to_thread(lambda: df_novel_details["novel_title"].item()),
-            asyncio.to_thread(lambda: df_novel_details["category"].item()),
-            asyncio.to_thread(lambda: df_novel_details["total_bab"].item()),
-            asyncio.to_thread(lambda: df_novel_favorite["total_favorite"].item()),
-            asyncio.to_thread(lambda: df_novel_details["bab_belum_terbit"].item()),
-            asyncio.to_thread(lambda: df_novel_details["bab_terbit"].item()),
-            asyncio.to_thread(lambda: df_novel_details["tanggal_terbit"].item()),
-            asyncio.to_thread(lambda: df_novel_details["status"].item()),
-            asyncio.to_thread(lambda: df_novel_details["last_updated"].item()),
-            asyncio.to_thread(lambda: df_novel_details["Nama Pena"].item()),
-            asyncio.to_thread(lambda: df_novel_details["Nama Penulis"].item()),
-            asyncio.to_thread(lambda: df_novel_details["Gender"].item()),
-            asyncio.to_thread(lambda: df_novel_details["Email Penulis"].item()),
-            asyncio.to_thread(lambda: df_novel_details["WA"].item()),
-            asyncio.to_thread(lambda: df_novel_details["Alamat"].item()),
-            asyncio.to_thread(lambda: int(df_reader_guest["user_id"].count() + df_reader_register["user_id"].count())),
-            asyncio.to_thread(lambda: int(df_reader_guest["user_id"].count())),
-            asyncio.to_thread(lambda: int(df_reader_register["user_id"].count())),
-            asyncio.to_thread(lambda: int(df_reader_guest["chapter_count"].sum() + df_reader_register["chapter_count"].sum())),
-            asyncio.to_thread(lambda: int(df_reader_guest["chapter_count"].sum())),
-            asyncio.to_thread(lambda: int(df_reader_register["chapter_count"].sum())),
-            asyncio.to_thread(lambda: int(df_chapter_coin["user_id"].count())),
-            asyncio.to_thread(lambda: int(df_chapter_adscoin["user_id"].count())),
-            asyncio.to_thread(lambda: int(df_chapter_ads["user_id"].count())),
-            asyncio.to_thread(lambda: int(df_chapter_coin["chapter_count"].sum())),
-            asyncio.to_thread(lambda: int(df_chapter_adscoin["chapter_count"].sum())),
-            asyncio.to_thread(lambda: int(df_chapter_ads["chapter_count"].sum())),
-            asyncio.to_thread(lambda: int(df_chapter_coin["user_id"].count() + df_chapter_adscoin["user_id"].count() + df_chapter_ads["user_id"].count())),
-            asyncio.to_thread(lambda: int(df_chapter_coin["chapter_count"].sum() + df_chapter_adscoin["chapter_count"].sum() + df_chapter_ads["chapter_count"].sum()))
-        )
+        # Split guest vs registered readers with one mask instead of two filtered frames
+        guest_mask = df_reader["email"].to_numpy() == "guest"
+        reader_chapters = df_reader["chapter_count"].to_numpy()
+        total_readers = len(guest_mask)
+        guest_readers = int(guest_mask.sum())
+        total_reader_chapters = int(reader_chapters.sum())
+        guest_reader_chapters = int(reader_chapters[guest_mask].sum())
+
+        chapter_coin_unique = int(df_chapter_coin["user_id"].count())
+        chapter_adscoin_unique = int(df_chapter_adscoin["user_id"].count())
+        chapter_ads_unique = int(df_chapter_ads["user_id"].count())
+        chapter_coin_count = int(df_chapter_coin["chapter_count"].sum())
+        chapter_adscoin_count = int(df_chapter_adscoin["chapter_count"].sum())
+        chapter_ads_count = int(df_chapter_ads["chapter_count"].sum())
 
         data = {
-            "id_novel": metrics[0],
-            "judul_novel": metrics[1],
-            "category": metrics[2],
-            "total_bab": metrics[3],
-            "total_favorite": metrics[4],
-            "belum_terbit": metrics[5],
-            "bab_terbit":metrics[6],
-            "tanggal_terbit": metrics[7],
-            "status": metrics[8],
-            "last_updated": metrics[9],
-            "nama_pena": metrics[10],
-            "nama_penulis": metrics[11],
-            "gender": metrics[12],
-            "email": metrics[13],
-            "no_tlp": f"0{metrics[14]}",
-            "alamat": metrics[15],
-            "total_pembaca_unique": metrics[16],
-            "guest_pembaca_unique": metrics[17],
-            "regis_pembaca_unique": metrics[18],
-            "total_pembaca_count": metrics[19],
-            "guest_pembaca_count": metrics[20],
-            "regis_pembaca_count": metrics[21],
-            "chapter_coin_unique": metrics[22],
-            "chapter_adscoin_unique": metrics[23],
-            "chapter_ads_unique": metrics[24],
-            "chapter_coin_count": metrics[25],
-            "chapter_adscoin_count": metrics[26],
-            "chapter_ads_count": metrics[27],
-            "total_chapter_unique": metrics[28],
-            "total_chapter_count": metrics[29],
+            "id_novel": novel["id_novel"],
+            "judul_novel": novel["novel_title"],
+            "category": novel["category"],
+            "total_bab": novel["total_bab"],
+            "total_favorite": novel_favorite["total_favorite"],
+            "belum_terbit": novel["bab_belum_terbit"],
+            "bab_terbit": novel["bab_terbit"],
+            "tanggal_terbit": novel["tanggal_terbit"],
+            "status": novel["status"],
+            "last_updated": novel["last_updated"],
+            "nama_pena": novel["Nama Pena"],
+            "nama_penulis": novel["Nama Penulis"],
+            "gender": novel["Gender"],
+            "email": novel["Email Penulis"],
+            "no_tlp": f"0{novel['WA']}",
+            "alamat": novel["Alamat"],
+            "total_pembaca_unique": total_readers,
+            "guest_pembaca_unique": guest_readers,
+            "regis_pembaca_unique": total_readers - guest_readers,
+            "total_pembaca_count": total_reader_chapters,
+            "guest_pembaca_count": guest_reader_chapters,
+            "regis_pembaca_count": total_reader_chapters - guest_reader_chapters,
+            "chapter_coin_unique": chapter_coin_unique,
+            "chapter_adscoin_unique": chapter_adscoin_unique,
+            "chapter_ads_unique": chapter_ads_unique,
+            "chapter_coin_count": chapter_coin_count,
+            "chapter_adscoin_count": chapter_adscoin_count,
+            "chapter_ads_count": chapter_ads_count,
+            "total_chapter_unique": chapter_coin_unique + chapter_adscoin_unique + chapter_ads_unique,
+            "total_chapter_count": chapter_coin_count + chapter_adscoin_count + chapter_ads_count,
         }
 
         return data
@@ -867,33 +928,13 @@ class NovelDetails:
             if df.empty:
                 return json.dumps({'error': 'No data available for the specified filters.'})
 
-            # Sorting data
-            if types == "reader":
-                await asyncio.to_thread(lambda: df.sort_values(by='last_read_date', ascending=False, inplace=True))
-            else:
-                await asyncio.to_thread(lambda: df.sort_values(by='last_purchase_date', ascending=False, inplace=True))
+            # Sorting data (descending by last activity date)
+            key = df["last_read_date"].values if types == "reader" else df["last_purchase_date"].values
+            df = df.take(np.argsort(key, kind="stable")[::-1])
 
-            # Create Plotly Table
-            fig = go.Figure(
-                data=[go.Table(
-                    columnorder = [1, 2, 3, 4, 5, 6, 7],
-                    columnwidth = [40, 40, 80, 40, 40, 80, 40],
-                    header=dict(
-                        fill_color="grey",
-                        line_color="black",
-                        font=dict(color="black"),
-                        values=list(df.columns),
-                        align='center'
-                    ),
-                    cells=dict(
-                        fill_color="white",
-                        line_color="black",
-                        font=dict(color="black"),
-                        values=[df[col] for col in df.columns],
-                        align='center'
-                    )
-                )]
-            )
+            # Stringify date columns once so the encoder only sees primitives
+            date_cols = [col for col in df.columns if col.endswith("_date")]
+            df[date_cols] = df[date_cols].astype(str).mask(df[date_cols].isna())
 
             # Dynamically set the title based on coin_type
             title_mapping = {
@@ -902,9 +943,16 @@ class NovelDetails:
                 'ads-coin': 'Users Chapter Purchase With AdsCoin',
                 'ads': 'Users Chapter Purchase With Ads'
             }
-            fig.update_layout(title=title_mapping.get(types, 'Users Chapter Purchase'))
 
-            chart = await asyncio.to_thread(json.dumps, fig, cls=plotly.utils.PlotlyJSONEncoder)
+            # Create Plotly Table
+            fig = table_figure(
+                df,
+                title=title_mapping.get(types, 'Users Chapter Purchase'),
+                columnorder=[1, 2, 3, 4, 5, 6, 7],
+                columnwidth=[40, 40, 80, 40, 40, 80, 40]
+            )
+
+            chart = figure_to_json(fig)
 
             return chart
 
@@ -924,15 +972,14 @@ class NovelDetails:
         Returns:
             str: A JSON string representation of the generated visualization or table.
         """
-        df = self.df_frequency.copy()
-        await asyncio.to_thread(lambda: df.sort_values(by="order", ascending=True, inplace=True))
+        df = self.df_frequency
         
         if data == 'chart':
             fig = go.Figure(
                 go.Bar(
                     x=df["bab"],
                     y=df["total_pembaca"],
-                    text=df["total_pembaca"].apply(lambda x: "{:,.0f}".format((x))),
+                    text=df["total_pembaca_text"],
                     textposition="inside"
                 )
             )
@@ -942,29 +989,11 @@ class NovelDetails:
                 yaxis_title="Total User"
             )
         elif data == "table":
-            df = df.loc[:, ["bab", "total_pembaca"]].copy()
-            df["total_pembaca"] = df["total_pembaca"].apply(lambda x: "{:,.0f}".format((x)))
-            df.rename(columns={"bab": "Chapter", "total_pembaca": "Chapter Reader"}, inplace=True)
-            fig = go.Figure(
-                go.Table(
-                    header=dict(
-                        fill_color="grey",
-                        line_color="black",
-                        font=dict(color="black"),
-                        values=list(df.columns),
-                        align='center'
-                    ),
-                    cells=dict(
-                        fill_color="white",
-                        line_color="black",
-                        font=dict(color="black"),
-                        values=[df[col] for col in df.columns],
-                        align='center'
-                    )
-                )
+            df = df.loc[:, ["bab", "total_pembaca_text"]].rename(
+                columns={"bab": "Chapter", "total_pembaca_text": "Chapter Reader"}
             )
-            fig.update_layout(title="Chapter Reader Frequency Distribution Table")
+            fig = table_figure(df, title="Chapter Reader Frequency Distribution Table")
 
-        chart = await asyncio.to_thread(json.dumps, fig, cls=plotly.utils.PlotlyJSONEncoder)
+        chart = figure_to_json(fig)
 
         return chart
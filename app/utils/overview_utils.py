@@ -1,14 +1,317 @@
+import os
+import tempfile
+import time
+import numpy as np
 import pandas as pd
+import pyarrow as pa
+import pyarrow.csv as pa_csv
+import pyarrow.parquet as pq
 import asyncio
-import json
-import plotly
+import aiofiles
+from functools import lru_cache
 import plotly.graph_objects as go
-from plotly.subplots import make_subplots
-from sqlalchemy import func, select
+from sqlalchemy import case, func, select
 from sqlalchemy.ext.asyncio import AsyncSession
 from datetime import datetime, timedelta
 from app.utils.new_install_utils import cost
 from app.db.models.acquisition import Ga4ActiveUserData, AdmobReportData, AdsenseReportData
+from app.utils.common_utils import SingleFlightCache, calculate_growth_percentage, figure_to_json, thousands_formatter
+
+DAU_MAU_CSV = './csv/dau_mau_{}.csv'
+DAU_MAU_PARQUET = './parquet/dau_mau_{}.parquet'
+DAU_MAU_COLUMNS = ['date', 'daily_active_user', 'monthly_active_user']
+DAU_MAU_SCHEMA = {'date': pa.date32(), 'daily_active_user': pa.int32(), 'monthly_active_user': pa.int32()}
+DAU_MAU_PLATFORMS = ('android', 'ios', 'web')
+DAU_MAU_RESTAT_SECONDS = 60
+COST_REVENUE_DTYPES = {'cost': np.float64, 'revenue': np.float64, 'revenue_to_cost': np.float64}
+
+# platform -> (monotonic time of the last CSV stat, CSV mtime, (memoized DAU/MAU frame, datetime64[D] dates))
+_FRAMES = {}
+
+# (csv path, tail rows) -> (st_mtime_ns, parsed DataFrame)
+_CSV_CACHE = {}
+
+# Chart JSON keyed by the chart name and every argument the chart depends on
+_chart_cache = SingleFlightCache(maxsize=64, ttl=300)
+
+
+def _cost_revenue_layout(title: str) -> go.Layout:
+    """
+    Build the stacked cost / revenue layout with a 'Cost To Revenue' percentage secondary y-axis.
+
+    Args:
+        title (str): The title of the chart.
+
+    Returns:
+        go.Layout: The chart layout.
+    """
+    return go.Layout(
+        title=title,
+        barmode='stack',
+        legend=dict(yanchor="top", y=0.99, xanchor="left", x=0.01),
+        yaxis=dict(
+            title='Cost'
+        ),
+        yaxis2=dict(
+            title='Cost To Revenue',
+            overlaying='y',
+            side='right',
+            # Set the y-axis format to be a percentage with 2 decimal places
+            tickformat='.0%'
+        )
+    )
+
+
+# Static chart layouts, built once; go.Figure copies the layout it is given so these are never mutated
+_DAILY_COST_REVENUE_LAYOUT = _cost_revenue_layout('Cost To Revenue Per Hari')
+_WEEKLY_COST_REVENUE_LAYOUT = _cost_revenue_layout('Cost To Revenue Per Minggu')
+_PAYMENT_CHANNEL_LAYOUT = go.Layout(title='Payment Channel')
+
+
+def _date_slice(
+        df: pd.DataFrame,
+        from_date: datetime.date,
+        to_date: datetime.date,
+        column: str = 'date',
+        dates: np.ndarray = None) -> pd.DataFrame:
+    """
+    Slice the rows of a DataFrame sorted by `column` to the `from_date` - `to_date` range (inclusive).
+
+    Args:
+        df (pd.DataFrame): The DataFrame, sorted ascending by `column`.
+        from_date (datetime.date): The start date of the date range.
+        to_date (datetime.date): The end date of the date range.
+        column (str, optional): The date column to slice on. Defaults to 'date'.
+        dates (np.ndarray, optional): A precomputed `datetime64[D]` copy of `column`, searched with native
+            comparisons instead of `datetime.date` objects. Defaults to None.
+
+    Returns:
+        pandas.DataFrame: The rows within the date range.
+    """
+    if dates is None:
+        dates = df[column].to_numpy()
+    else:
+        from_date, to_date = np.datetime64(from_date, 'D'), np.datetime64(to_date, 'D')
+    lo = np.searchsorted(dates, from_date, side='left')
+    hi = np.searchsorted(dates, to_date, side='right')
+    return df.iloc[lo:hi]
+
+
+def _csv_to_parquet(platform: str) -> str:
+    """
+    Convert `dau_mau_{platform}.csv` to Parquet with a typed DATE32 `date` and INT32 user count columns.
+
+    The Parquet file is only regenerated when the CSV has been modified after it was written.
+
+    Args:
+        platform (str): The platform of the file ('android', 'ios', or 'web').
+
+    Returns:
+        str: The path of the Parquet file.
+    """
+    csv_path = DAU_MAU_CSV.format(platform)
+    parquet_path = DAU_MAU_PARQUET.format(platform)
+
+    if not os.path.exists(parquet_path) or os.path.getmtime(parquet_path) < os.path.getmtime(csv_path):
+        # Parse the CSV with the multi-threaded Arrow reader, typing the columns while parsing
+        table = pa_csv.read_csv(
+            csv_path,
+            read_options=pa_csv.ReadOptions(use_threads=True),
+            convert_options=pa_csv.ConvertOptions(column_types=DAU_MAU_SCHEMA, include_columns=DAU_MAU_COLUMNS)
+        )
+        os.makedirs(os.path.dirname(parquet_path), exist_ok=True)
+        # Write to a uniquely named temporary file first, so concurrent readers never see a partial
+        # file and two worker threads converting at once never write the same file
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(parquet_path), suffix=".tmp")
+        os.close(fd)
+        try:
+            pq.write_table(table, tmp_path)
+            os.replace(tmp_path, parquet_path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+
+    return parquet_path
+
+
+@lru_cache(maxsize=8)
+def _load_dau_mau(platform: str, mtime: float) -> tuple:
+    """
+    Load the full, typed DAU/MAU data of a platform.
+
+    The result is memoized; `mtime` is the modification time of the source CSV and is only part of the
+    cache key, so a refreshed CSV is loaded again instead of serving a stale frame.
+
+    Args:
+        platform (str): The platform of the file ('android', 'ios', or 'web').
+        mtime (float): The modification time of the platform CSV file.
+
+    Returns:
+        tuple: A DataFrame with 'date', 'daily_active_user' and 'monthly_active_user' columns sorted by 'date',
+            and its 'date' column as a `datetime64[D]` array for `_date_slice`.
+    """
+    df = pd.read_parquet(_csv_to_parquet(platform), columns=DAU_MAU_COLUMNS)
+    df = df.sort_values('date', ignore_index=True)
+    return df, df['date'].to_numpy().astype('datetime64[D]')
+
+
+def _dau_mau_frame(platform: str) -> tuple:
+    """
+    Return the in-memory DAU/MAU frame of a platform.
+
+    The CSV is only re-stat'ed once every `DAU_MAU_RESTAT_SECONDS`; in between, requests are served from
+    `_FRAMES` without touching the disk.
+
+    Args:
+        platform (str): The platform of the file ('android', 'ios', or 'web').
+
+    Returns:
+        tuple: The memoized frame and date array returned by `_load_dau_mau`.
+    """
+    now = time.monotonic()
+    entry = _FRAMES.get(platform)
+    if entry is None or now - entry[0] >= DAU_MAU_RESTAT_SECONDS:
+        mtime = os.path.getmtime(DAU_MAU_CSV.format(platform))
+        entry = (now, mtime, _load_dau_mau(platform, mtime))
+        _FRAMES[platform] = entry
+    return entry[2]
+
+
+def load_dau_mau_frames():
+    """
+    Load the DAU/MAU frames of every platform with a CSV file into `_FRAMES`.
+
+    Called once at application startup so the first overview requests do not pay for the CSV/Parquet reads.
+    """
+    for platform in DAU_MAU_PLATFORMS:
+        if os.path.exists(DAU_MAU_CSV.format(platform)):
+            _dau_mau_frame(platform)
+
+
+def _read_dau_mau(platform: str, from_date: datetime.date, to_date: datetime.date) -> pd.DataFrame:
+    """
+    Read the DAU/MAU data of a platform between `from_date` and `to_date`.
+
+    Args:
+        platform (str): The platform of the file ('android', 'ios', or 'web').
+        from_date (datetime.date): The start date of the date range.
+        to_date (datetime.date): The end date of the date range.
+
+    Returns:
+        pandas.DataFrame: A new DataFrame with 'date', 'daily_active_user' and 'monthly_active_user' columns,
+            safe to modify without touching the memoized frame.
+    """
+    df, dates = _dau_mau_frame(platform)
+    return _date_slice(df, from_date, to_date, dates=dates)
+
+
+def _sum_platforms(frames: list, from_date: datetime.date, to_date: datetime.date) -> tuple:
+    """
+    Sum the DAU/MAU data of several platforms per date.
+
+    Every platform is reindexed onto the same `from_date` - `to_date` dates, so the totals are plain array
+    additions instead of outer merges. Like the outer merge, a date missing from one of the platforms sums to
+    NaN, and dates missing from every platform are dropped.
+
+    Args:
+        frames (list): The DAU/MAU DataFrames returned by `_read_dau_mau`, one per platform.
+        from_date (datetime.date): The start date of the date range.
+        to_date (datetime.date): The end date of the date range.
+
+    Returns:
+        tuple: The sorted dates, the summed daily active users and the summed monthly active users as arrays.
+    """
+    # Align every platform on the shared date range
+    dates = pd.date_range(from_date, to_date).date
+    daily_active_user = np.zeros(len(dates), dtype=np.float64)
+    monthly_active_user = np.zeros(len(dates), dtype=np.float64)
+    present = np.zeros(len(dates), dtype=bool)
+    for df in frames:
+        aligned = df.set_index('date').reindex(dates)
+        daily_active_user += aligned['daily_active_user'].to_numpy(dtype=np.float64)
+        monthly_active_user += aligned['monthly_active_user'].to_numpy(dtype=np.float64)
+        present |= aligned['daily_active_user'].notna().to_numpy()
+
+    return dates[present], daily_active_user[present], monthly_active_user[present]
+
+
+def _preprocess_platforms(frames: list, from_date: datetime.date, to_date: datetime.date) -> pd.DataFrame:
+    """
+    Sum the DAU/MAU data of several platforms per date and calculate the combined DAU, MAU & stickiness.
+
+    Args:
+        frames (list): The DAU/MAU DataFrames returned by `_read_dau_mau`, one per platform.
+        from_date (datetime.date): The start date of the date range.
+        to_date (datetime.date): The end date of the date range.
+
+    Returns:
+        pandas.DataFrame: A DataFrame with 'date', 'daily_active_user', 'monthly_active_user' and 'stickiness' columns.
+    """
+    dates, daily_active_user, monthly_active_user = _sum_platforms(frames, from_date, to_date)
+
+    # Calculate DAU, MAU, & Stickieness
+    with np.errstate(divide='ignore', invalid='ignore'):
+        stickiness = daily_active_user / monthly_active_user
+    return pd.DataFrame({
+        'date': dates,
+        'daily_active_user': daily_active_user,
+        'monthly_active_user': monthly_active_user,
+        'stickiness': stickiness
+    })
+
+
+def _preprocess_web(from_date: datetime.date, to_date: datetime.date) -> pd.DataFrame:
+    """
+    Calculate the web DAU, MAU & stickiness.
+
+    Args:
+        from_date (datetime.date): The start date of the date range.
+        to_date (datetime.date): The end date of the date range.
+
+    Returns:
+        pandas.DataFrame: A DataFrame with 'date', 'daily_active_user', 'monthly_active_user' and 'stickiness' columns.
+    """
+    df_web = _read_dau_mau('web', from_date, to_date)
+    # Calculate stickieness
+    df_web['stickiness'] = df_web['daily_active_user'] / df_web['monthly_active_user']
+    # filtering the dataframe
+    return _date_slice(df_web, from_date, to_date)
+
+
+def _dau_mau_stickiness(source: str, from_date: datetime.date, to_date: datetime.date) -> dict:
+    """
+    Calculate only the last day and average DAU/MAU stickiness, without building the DataFrame.
+
+    Args:
+        source (str): The source of the data ('app', 'web', or 'all').
+        from_date (datetime.date): The start date of the date range.
+        to_date (datetime.date): The end date of the date range.
+
+    Returns:
+        dict: The 'last_day' and 'average' stickiness, rounded to 4 decimal places.
+    """
+    if source == 'web':
+        df_web = _read_dau_mau('web', from_date, to_date)
+        dates = df_web['date'].to_numpy()
+        daily_active_user = df_web['daily_active_user'].to_numpy(dtype=np.float64)
+        monthly_active_user = df_web['monthly_active_user'].to_numpy(dtype=np.float64)
+    else:
+        platforms = ('android', 'ios') if source == 'app' else DAU_MAU_PLATFORMS
+        frames = [_read_dau_mau(platform, from_date, to_date) for platform in platforms]
+        dates, daily_active_user, monthly_active_user = _sum_platforms(frames, from_date, to_date)
+
+    # Default data if there is no data in the date range
+    if len(dates) == 0:
+        return {"last_day": 0.0, "average": 0.0}
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        stickiness = daily_active_user / monthly_active_user
+    last_day = np.searchsorted(dates, to_date)
+    valid = stickiness[~np.isnan(stickiness)]
+    return {
+        "last_day": float(round(stickiness[last_day], 4)) if last_day < len(dates) and dates[last_day] == to_date else 0,
+        "average": float(round(valid.mean(), 4)) if len(valid) else float("nan")
+    }
 
 
 async def dau_mau_df(
@@ -19,7 +322,7 @@ async def dau_mau_df(
     """
     Generate a DataFrame containing daily active users (DAU), monthly active users (MAU), and stickiness.
 
-    This function reads daily and monthly active user data from CSV files, merges them based on the source,
+    This function reads daily and monthly active user data from the Parquet copies of the CSV files, merges them based on the source,
     calculates stickiness, and filters the data based on the specified date range and source.
 
     Args:
@@ -35,60 +338,29 @@ async def dau_mau_df(
         CSV files are expected to be named 'dau_mau_android.csv', 'dau_mau_ios.csv', and 'dau_mau_web.csv'.
         Ensure the necessary packages are installed:
             - pandas
+            - pyarrow
     """
 
+    # Only the two stickiness scalars are needed, skip building the DataFrame
+    if data == "stickiness":
+        return await asyncio.to_thread(_dau_mau_stickiness, source, from_date, to_date)
+
+    # Read the platform data concurrently, then pre process it in a single thread hop
     if source == 'app':
-        # Pre process data read csv file, convert to datetime type, renameing column, merge the data
-        df_android = await asyncio.to_thread(pd.read_csv, './csv/dau_mau_android.csv', delimiter=',', index_col=False)
-        await asyncio.to_thread(lambda: df_android.rename(columns={'daily_active_user':'daily_active_user_android', 'monthly_active_user':'monthly_active_user_android'}, inplace=True))
-        df_android["date"] = await asyncio.to_thread(pd.to_datetime, df_android['date'])
-        df_android['date'] = await asyncio.to_thread(lambda: df_android['date'].dt.date)
-        df_ios = await asyncio.to_thread(pd.read_csv, './csv/dau_mau_ios.csv', delimiter=',', index_col=False)
-        await asyncio.to_thread(lambda: df_ios.rename(columns={'daily_active_user':'daily_active_user_ios', 'monthly_active_user':'monthly_active_user_ios'}, inplace=True))
-        df_ios['date'] = await asyncio.to_thread(pd.to_datetime, df_ios['date'])
-        df_ios['date'] = await asyncio.to_thread(lambda: df_ios['date'].dt.date)
-        df_app = await asyncio.to_thread(lambda: pd.merge(df_android, df_ios, on=['date'], how='outer'))
-        # Calculate DAU, MAU, & Stickieness
-        df_app['daily_active_user'] = await asyncio.to_thread(lambda: df_app['daily_active_user_ios'] + df_app['daily_active_user_android'])
-        df_app['monthly_active_user'] = await asyncio.to_thread(lambda: df_app['monthly_active_user_ios'] + df_app['monthly_active_user_android'])
-        df_app['stickiness'] =await asyncio.to_thread(lambda:  df_app['daily_active_user'] / df_app['monthly_active_user'])
-        # filtering the dataframe
-        df_app = await asyncio.to_thread(lambda: df_app.loc[:, ['date', 'daily_active_user', 'monthly_active_user', 'stickiness']])
-        filtered_df = await asyncio.to_thread(lambda: df_app[(df_app['date'] >= from_date) & (df_app['date'] <= to_date)])
+        df_android, df_ios = await asyncio.gather(
+            asyncio.to_thread(_read_dau_mau, 'android', from_date, to_date),
+            asyncio.to_thread(_read_dau_mau, 'ios', from_date, to_date)
+        )
+        filtered_df = await asyncio.to_thread(_preprocess_platforms, [df_android, df_ios], from_date, to_date)
     elif source == 'web':
-        # Pre process data. Read CSV and convert date object to datetime type
-        df_web = await asyncio.to_thread(pd.read_csv, './csv/dau_mau_web.csv', delimiter=',', index_col=False)
-        df_web['date'] = await asyncio.to_thread(pd.to_datetime, df_web['date'])
-        df_web['date'] = await asyncio.to_thread(lambda: df_web['date'].dt.date)
-        # Calculate stickieness
-        df_web['stickiness'] = await asyncio.to_thread(lambda: df_web['daily_active_user'] / df_web['monthly_active_user'])
-        # filtering the dataframe
-        filtered_df = await asyncio.to_thread(lambda: df_web[(df_web['date'] >= from_date) & (df_web['date'] <= to_date)])
+        filtered_df = await asyncio.to_thread(_preprocess_web, from_date, to_date)
     elif source == 'all':
-        # Pre process data. Read CSV and convert date object to datetime type, merege the data
-        df_android = await asyncio.to_thread(pd.read_csv, './csv/dau_mau_android.csv', delimiter=',', index_col=False)
-        await asyncio.to_thread(lambda: df_android.rename(columns={'daily_active_user':'daily_active_user_android', 'monthly_active_user':'monthly_active_user_android'}, inplace=True))
-        df_android['date'] = await asyncio.to_thread(pd.to_datetime, df_android['date'])
-        df_android['date'] = await asyncio.to_thread(lambda: df_android['date'].dt.date)
-        df_ios = await asyncio.to_thread(pd.read_csv, './csv/dau_mau_ios.csv', delimiter=',', index_col=False)
-        await asyncio.to_thread(lambda: df_ios.rename(columns={'daily_active_user':'daily_active_user_ios', 'monthly_active_user':'monthly_active_user_ios'}, inplace=True))
-        df_ios['date'] = await asyncio.to_thread(pd.to_datetime, df_ios['date'])
-        df_ios['date'] = await asyncio.to_thread(lambda: df_ios['date'].dt.date)
-        df_web = await asyncio.to_thread(pd.read_csv, './csv/dau_mau_web.csv', delimiter=',', index_col=False)
-        df_web['date'] = await asyncio.to_thread(pd.to_datetime, df_web['date'])
-        df_web['date'] = await asyncio.to_thread(lambda: df_web['date'].dt.date)
-        await asyncio.to_thread(lambda: df_web.rename(columns={'daily_active_user':'daily_active_user_web', 'monthly_active_user':'monthly_active_user_web'}, inplace=True))
-        df_merge = await asyncio.to_thread(lambda: pd.merge(df_android, df_ios, on=['date'], how='outer'))
-        df_merge['date'] = await asyncio.to_thread(pd.to_datetime, df_merge['date'])
-        df_merge['date'] = await asyncio.to_thread(lambda: df_merge['date'].dt.date)
-        df_all = await asyncio.to_thread(lambda: pd.merge(df_merge, df_web, on='date', how='outer'))
-        # Calculate MAU, DAU & Sticieness
-        df_all['daily_active_user'] = await asyncio.to_thread(lambda: df_all['daily_active_user_ios'] + df_all['daily_active_user_android'] + df_all['daily_active_user_web'])
-        df_all['monthly_active_user'] = await asyncio.to_thread(lambda: df_all['monthly_active_user_ios'] + df_all['monthly_active_user_android'] + df_all['monthly_active_user_web'])
-        df_all['stickiness'] =await asyncio.to_thread(lambda:  df_all['daily_active_user'] / df_all['monthly_active_user'])
-        # Filtering the data
-        df_all = await asyncio.to_thread(lambda: df_all.loc[:, ['date', 'daily_active_user', 'monthly_active_user', 'stickiness']])
-        filtered_df = await asyncio.to_thread(lambda: df_all[(df_all['date'] >= from_date) & (df_all['date'] <= to_date)])
+        df_android, df_ios, df_web = await asyncio.gather(
+            asyncio.to_thread(_read_dau_mau, 'android', from_date, to_date),
+            asyncio.to_thread(_read_dau_mau, 'ios', from_date, to_date),
+            asyncio.to_thread(_read_dau_mau, 'web', from_date, to_date)
+        )
+        filtered_df = await asyncio.to_thread(_preprocess_platforms, [df_android, df_ios, df_web], from_date, to_date)
 
     # Make default data if dataframe empty
     if filtered_df.empty:
@@ -97,14 +369,28 @@ async def dau_mau_df(
         filtered_df['monthly_active_user'] = 0
         filtered_df['stickiness'] = 0
 
-    df = await asyncio.to_thread(lambda: filtered_df[(filtered_df['date'] >= from_date) & (filtered_df['date'] <= to_date)])
-    stickiness = await asyncio.to_thread(lambda: filtered_df[filtered_df['date'] == to_date])
-    data_stickiness = {
-        "last_day": float(round(stickiness["stickiness"].item(), 4)) if to_date in stickiness["date"].values else 0,
-        "average": float(round(df["stickiness"].mean(), 4))
-    }
-    
-    return df if data == "dataframe" else data_stickiness
+    return _date_slice(filtered_df, from_date, to_date)
+
+
+def _preprocess_ga4(df_group: pd.DataFrame, from_date: datetime.date, to_date: datetime.date):
+    """
+    Calculate the GA4 stickiness of the active users grouped by date.
+
+    Args:
+        df_group (pd.DataFrame): The GA4 active users of one source, grouped by date.
+        from_date (datetime.date): The start date of the date range.
+        to_date (datetime.date): The end date of the date range.
+
+    Returns:
+        tuple: The grouped DataFrame and the same data filtered to the date range.
+    """
+    # Calculate stickieness
+    df_group['stickiness'] = df_group['active1DayUsers'] / df_group['active28DayUsers']
+    df_group = df_group.fillna(0)
+    # filtering the data by date
+    df_filter = _date_slice(df_group, from_date, to_date)
+
+    return df_group, df_filter
 
 
 async def ga4_mau_dau_df(
@@ -134,13 +420,17 @@ async def ga4_mau_dau_df(
         ga4_mau_dau_df(from_date='2024-01-01', to_date='2024-01-31')
     """
 
-    # Initiate the data
+    # Initiate the data, normalizing android & ios to app and grouping by date in SQL
+    platform = func.lower(Ga4ActiveUserData.platform)
+    platform_case = case((platform.in_(["android", "ios"]), "app"), else_=platform)
     query = select(
         Ga4ActiveUserData.date.label("date"), 
-        Ga4ActiveUserData.platform.label("platform"), 
-        Ga4ActiveUserData.active_1day_users.label("active1DayUsers"), 
-        Ga4ActiveUserData.active_28day_users.label("active28DayUsers")
-    ).filter(func.date(Ga4ActiveUserData.date).between(from_date, to_date))
+        func.sum(Ga4ActiveUserData.active_28day_users).label("active28DayUsers"),
+        func.sum(Ga4ActiveUserData.active_1day_users).label("active1DayUsers")
+    ).filter(
+        func.date(Ga4ActiveUserData.date).between(from_date, to_date),
+        platform_case == source
+    ).group_by(Ga4ActiveUserData.date).order_by(Ga4ActiveUserData.date)
     result = await session.execute(query)
     result_data = result.fetchall()
 
@@ -149,40 +439,21 @@ async def ga4_mau_dau_df(
     if df.empty:
         df = pd.DataFrame({
             "date": pd.date_range(to_date, to_date).date,
-            "platform": ["app"],
-            "active1DayUsers": [0],
-            "active28DayUsers": [0]
+            "active28DayUsers": [0],
+            "active1DayUsers": [0]
         })
     
-    df['platform'] = await asyncio.to_thread(lambda: df['platform'].str.lower())
-    await asyncio.to_thread(lambda: df.replace({"platform": ["android", "ios"]}, value="app", inplace=True))
-    df = await asyncio.to_thread(lambda: df[df['platform'] == source])
-    
-    #  Group data by date
-    df_group = await asyncio.to_thread(
-        lambda: df.groupby(["date"]).agg(
-            active28DayUsers=("active28DayUsers", "sum"),
-            active1DayUsers=("active1DayUsers", "sum")
-        ).reset_index())
-    # convert date column to datetime type and merge data
-    df_group['date'] = await asyncio.to_thread(pd.to_datetime, df_group['date'])
-    df_group['date'] = await asyncio.to_thread(lambda: df_group['date'].dt.date)
-    # Calculate stickieness
-    df_group['stickiness'] = await asyncio.to_thread(lambda: df_group['active1DayUsers'] / df_group['active28DayUsers'])
-    await asyncio.to_thread(lambda: df_group.fillna(0, inplace=True))
-    # filtering the data by date
-    df_filter = await asyncio.to_thread(lambda: df_group[(df_group['date'] >= from_date) & (df_group['date'] <= to_date)])
-    df_filter['date'] = await asyncio.to_thread(pd.to_datetime, df_filter['date'])
-    df_filter['date'] = await asyncio.to_thread(lambda: df_filter['date'].dt.date)
+    # Pre process the data in a single thread hop
+    df_group, df_filter = await asyncio.to_thread(_preprocess_ga4, df, from_date, to_date)
     
-    stickiness = await asyncio.to_thread(lambda: df_group[df_group["date"] == to_date])
+    stickiness = df_group[df_group["date"] == to_date]
     data_stickiness = {
         "last_day": float(round(stickiness["stickiness"].item(), 4)) if to_date in stickiness["date"].values else 0,
         "average": float(round(df_filter["stickiness"].mean(), 4))
     }
     
     if df_filter.empty:
-        df_filter['date'] = pd.date_range(from_date, to_date)
+        df_filter['date'] = pd.date_range(from_date, to_date).date
         df_filter['active28DayUsers'] = 0
         df_filter['active1DayUsers'] = 0
         df_filter['stickiness']= 0.00
@@ -258,19 +529,38 @@ async def dg_stickiness(
         raise ValueError("Data from different periods must have the same keys")
 
     # Calculate daily growth percentage
-    growth_percentage = {}
-    for key in current_data:
-        old_value = last_week_data[key]
-        new_value = current_data[key]
+    return calculate_growth_percentage(current_data, last_week_data)
 
-        if old_value == 0:
-            percentage = 0
-        else:
-            percentage = (new_value - old_value) / old_value
-        
-        growth_percentage[key] = round(percentage, ndigits=4)
-        
-    return growth_percentage
+
+def _secondary_y_figure(x: pd.Series, primary: dict, secondary: dict, yaxis_title: str) -> dict:
+    """
+    Build a two line chart with a secondary y-axis as a plain figure dict.
+
+    Produces the same figure as `make_subplots(specs=[[{"secondary_y": True}]])` with two `add_trace` calls,
+    without going through the validated `plotly.graph_objects` layer.
+
+    Args:
+        x (pd.Series): The dates shared by both lines.
+        primary (dict): The 'y' values and scatter attributes of the line on the primary y-axis.
+        secondary (dict): The 'y' values and scatter attributes of the line on the secondary y-axis.
+        yaxis_title (str): The title of both y-axes.
+
+    Returns:
+        dict: The figure, ready for `figure_to_json`.
+    """
+    dates = x.tolist()
+    data = [
+        dict(type='scatter', mode='lines+markers', x=dates, y=trace['y'].to_numpy(dtype=np.float64),
+             text=thousands_formatter(trace['y']).tolist(), xaxis='x', yaxis=yaxis,
+             **{key: value for key, value in trace.items() if key != 'y'})
+        for trace, yaxis in ((primary, 'y'), (secondary, 'y2'))
+    ]
+    layout = dict(
+        xaxis=dict(anchor='y', domain=[0.0, 0.94], title=dict(text='Date'), dtick='D1'),
+        yaxis=dict(anchor='x', domain=[0.0, 1.0], title=dict(text=yaxis_title)),
+        yaxis2=dict(anchor='x', overlaying='y', side='right', title=dict(text=yaxis_title))
+    )
+    return dict(data=data, layout=layout)
 
 
 async def dau_mau_chart(
@@ -282,6 +572,8 @@ async def dau_mau_chart(
 
     This function generates a chart displaying the trends of Daily Active Users (DAU) and
     Monthly Active Users (MAU) over a specified date range and for a specified source.
+    The chart JSON is cached per (from_date, to_date, source) and DAU/MAU CSV modification times
+    for `_chart_cache.ttl` seconds.
 
     Args:
         from_date (str, optional): The start date of the date range in 'YYYY-MM-DD' format. Defaults to '2023-01-09'.
@@ -297,32 +589,28 @@ async def dau_mau_chart(
     Example:
         dau_mau_chart(from_date='2023-01-09', to_date='2023-02-23', source='app')
     """
+    # The CSV mtimes last seen by `_dau_mau_frame`, so a reloaded frame is never served from a stale chart
+    mtimes = tuple(_FRAMES[platform][1] if platform in _FRAMES else None for platform in DAU_MAU_PLATFORMS)
+    key = ('dau_mau_chart', from_date, to_date, source, mtimes)
+    return await _chart_cache.get(key, lambda: _dau_mau_chart(from_date, to_date, source))
+
 
-    # filtering dataframe and convert date column to datetime type 
+async def _dau_mau_chart(from_date: datetime.date, to_date: datetime.date, source: str) -> str:
+    """
+    Build the `dau_mau_chart` JSON, see `dau_mau_chart`.
+    """
+    # filtering dataframe, the date column is already datetime.date
     filtered_df = await dau_mau_df(from_date=from_date, to_date=to_date, source=source)
-    filtered_df['date'] = await asyncio.to_thread(pd.to_datetime, filtered_df['date'])
-    filtered_df['date'] = await asyncio.to_thread(lambda: filtered_df['date'].dt.date)
 
     # Create figure with secondary y-axis
-    fig = make_subplots(specs=[[{"secondary_y": True}]])
-    fig.add_trace(
-        go.Scatter(x=filtered_df.date, y=filtered_df.daily_active_user, line=dict(color='blue'),
-                   name='Daily Active User', mode='lines+markers', text=filtered_df['daily_active_user'].apply(lambda x: "{:,.0f}".format((x)))),
-        secondary_y=False
-    )
-    fig.add_trace(
-        go.Scatter(x=filtered_df.date, y=filtered_df.monthly_active_user, line=dict(color='red'),
-                   name='Monthly Active User', mode='lines+markers', text=filtered_df['monthly_active_user'].apply(lambda x: "{:,.0f}".format((x)))),
-        secondary_y=True
+    fig = _secondary_y_figure(
+        x=filtered_df['date'],
+        primary=dict(y=filtered_df['daily_active_user'], line=dict(color='blue'), name='Daily Active User'),
+        secondary=dict(y=filtered_df['monthly_active_user'], line=dict(color='red'), name='Monthly Active User'),
+        yaxis_title='Active Users'
     )
-    
-    if from_date in filtered_df['date'].values and to_date in filtered_df['date'].values:
-        fig.update_xaxes(title='Date', dtick='D1')
-    else:
-        fig.update_xaxes(title='Date', dtick='D1')
-    fig.update_yaxes(title='Active Users')
 
-    chart = await asyncio.to_thread(json.dumps, fig, cls=plotly.utils.PlotlyJSONEncoder)
+    chart = await asyncio.to_thread(figure_to_json, fig)
 
     return chart
 
@@ -334,6 +622,8 @@ async def ga4_mau_dau(
         source: str = 'app'):
     """
     Generate a chart showing 1-day and 28-day active users over a specified period.
+
+    The chart JSON is cached per (from_date, to_date, source) for `_chart_cache.ttl` seconds.
     
     Args:
         from_date (datetime.date): The start date for the data range.
@@ -343,28 +633,26 @@ async def ga4_mau_dau(
     Returns:
         str: The chart in JSON format.
     """
+    key = ('ga4_mau_dau', from_date, to_date, source)
+    return await _chart_cache.get(key, lambda: _ga4_mau_dau(session, from_date, to_date, source))
+
 
+async def _ga4_mau_dau(session: AsyncSession, from_date: datetime.date, to_date: datetime.date, source: str) -> str:
+    """
+    Build the `ga4_mau_dau` JSON, see `ga4_mau_dau`.
+    """
     # Initiate the data
     df_filter = await ga4_mau_dau_df(session=session, from_date=from_date, to_date=to_date, source=source)
 
     # Create figure with secondary y-axis
-    fig = make_subplots(specs=[[{"secondary_y": True}]])
-    fig.add_trace(
-        go.Scatter(x=df_filter['date'], y=df_filter['active1DayUsers'],
-                   name='1 Day Active User', mode='lines+markers', 
-                   text=df_filter['active1DayUsers'].apply(lambda x: "{:,.0f}".format((x)))),
-        secondary_y=False
+    fig = _secondary_y_figure(
+        x=df_filter['date'],
+        primary=dict(y=df_filter['active1DayUsers'], name='1 Day Active User'),
+        secondary=dict(y=df_filter['active28DayUsers'], name='28 Day Active User'),
+        yaxis_title='Active Users'
     )
-    fig.add_trace(
-        go.Scatter(x=df_filter['date'], y=df_filter['active28DayUsers'],
-                   name='28 Day Active User', mode='lines+markers', 
-                   text=df_filter['active28DayUsers'].apply(lambda x: "{:,.0f}".format((x)))),
-        secondary_y=True
-    )
-    fig.update_xaxes(title='Date', dtick='D1')
-    fig.update_yaxes(title='Active Users')
 
-    chart = await asyncio.to_thread(json.dumps, fig, cls=plotly.utils.PlotlyJSONEncoder)
+    chart = await asyncio.to_thread(figure_to_json, fig)
 
     return chart
 
@@ -392,112 +680,123 @@ async def install_chart(data: pd.DataFrame):
     """
     # create the chart
     fig = go.Figure(data=[
-        go.Bar(x=data['date'], y=data['total_install'], name='Total Install', text=data['total_install'].apply(lambda x: "{:,.0f}".format((x))), textposition='inside')
+        go.Bar(x=data['date'], y=data['total_install'], name='Total Install', text=thousands_formatter(data['total_install']), textposition='inside')
     ])
     fig.update_layout(title='Installs /Days', barmode='stack')
     fig.update_xaxes(title='Date', dtick='D1')
     fig.update_yaxes(title='Total install')
 
-    chart = await asyncio.to_thread(json.dumps, fig, cls=plotly.utils.PlotlyJSONEncoder)
+    chart = await asyncio.to_thread(figure_to_json, fig)
 
     return chart
 
 
-async def revenue_cost_periods_chart(
-        session: AsyncSession,
-        from_date: datetime.date, 
-        to_date: datetime.date, 
-        app_coin_data: pd.DataFrame, 
-        web_coin_data: pd.DataFrame):
+def _preprocess_revenue(
+        from_date: datetime.date,
+        to_date: datetime.date,
+        app_coin_data: pd.DataFrame,
+        web_coin_data: pd.DataFrame,
+        df_admob: pd.DataFrame,
+        df_adsense: pd.DataFrame,
+        df_spend: pd.DataFrame) -> pd.DataFrame:
     """
-    Generate a chart showing the revenue, cost, and cost-to-revenue ratio over a specified time period.
-
-    This function retrieves revenue and cost data for the given time period and generates a chart
-    showing the total revenue, total cost, and the cost-to-revenue ratio for each day within the period.
+    Merge the coin, admob and adsense revenue with the ads cost and calculate the cost to revenue ratio per day.
 
     Args:
-        from_date (str, optional): The start date of the time period in 'YYYY-MM-DD' format. Defaults to None.
-        to_date (str, optional): The end date of the time period in 'YYYY-MM-DD' format. Defaults to None.
+        from_date (datetime.date): The start date of the time period.
+        to_date (datetime.date): The end date of the time period.
         app_coin_data, web_coin_data: An Dict with revenue and cost data.
+        df_admob (pd.DataFrame): The admob earnings per day, in rupiah.
+        df_adsense (pd.DataFrame): The adsense report rows.
+        df_spend (pd.DataFrame): The daily ads cost.
 
     Returns:
-        str: A JSON representation of the generated chart.
-
-    Example:
-        revenue_cost_periods_chart(from_date='2023-01-01', to_date='2023-01-31', object_1=my_data_object)
+        pandas.DataFrame: The daily revenue, cost and cost to revenue, sorted by 'date_start'.
     """
-    
     # initiate data app web revenue and merge the data 
-    app_revenue_koin_df = app_coin_data['cost_revenue']
-    app_revenue_koin_df = pd.DataFrame(app_revenue_koin_df)
-    await asyncio.to_thread(lambda: app_revenue_koin_df.rename(columns={'total_rev_koin':'app_rev'}, inplace=True))
-    web_revenue_koin_df = web_coin_data['cost_revenue']
-    web_revenue_koin_df = pd.DataFrame(web_revenue_koin_df)
-    await asyncio.to_thread(lambda: web_revenue_koin_df.rename(columns={'total_rev_koin':'web_rev'}, inplace=True))
-    revenue_koin_df = await asyncio.to_thread(lambda: pd.merge(app_revenue_koin_df, web_revenue_koin_df, on='date_start', how='outer'))
-    await asyncio.to_thread(lambda: revenue_koin_df.fillna(0, inplace=True))
-    revenue_koin_df["app_rev"] = await asyncio.to_thread(lambda: revenue_koin_df["app_rev"].astype(int))
-    revenue_koin_df["web_rev"] = await asyncio.to_thread(lambda: revenue_koin_df["web_rev"].astype(int))
-    revenue_koin_df['total_rev_koin'] = await asyncio.to_thread(lambda: revenue_koin_df['app_rev'] + revenue_koin_df['web_rev'])
-    revenue_koin_df = await asyncio.to_thread(lambda: revenue_koin_df.loc[:, ['date_start', 'total_rev_koin']])
-    revenue_koin_df['date_start'] = await asyncio.to_thread(pd.to_datetime, revenue_koin_df['date_start'])
-    revenue_koin_df['date_start'] = await asyncio.to_thread(lambda: revenue_koin_df['date_start'].dt.date)
-
-    if revenue_koin_df.empty:
-        revenue_koin_df['date_start'] = pd.date_range(from_date, to_date)
-        revenue_koin_df['date_start'] = pd.to_datetime(revenue_koin_df['date_start']).dt.date
-        revenue_koin_df['total_rev_koin'] = 0
-
-    # Pre Process admob revenue
+    app_revenue_koin_df = pd.DataFrame(app_coin_data['cost_revenue'])
+    web_revenue_koin_df = pd.DataFrame(web_coin_data['cost_revenue'])
+    revenue_koin_df = pd.merge(app_revenue_koin_df, web_revenue_koin_df, on='date_start', how='outer', suffixes=('_app', '_web'))
+    # normalize the coin transaction timestamps to datetime.date once, every other source is already datetime.date
+    revenue_koin_df['date_start'] = pd.to_datetime(revenue_koin_df['date_start']).dt.date
+    revenue_koin_df = revenue_koin_df.fillna(0)
+    revenue_koin_df[["total_rev_koin_app", "total_rev_koin_web"]] = revenue_koin_df[["total_rev_koin_app", "total_rev_koin_web"]].astype(np.int64, copy=False)
+    revenue_koin_df['total_rev_koin'] = revenue_koin_df['total_rev_koin_app'] + revenue_koin_df['total_rev_koin_web']
+    revenue_koin_df = revenue_koin_df.loc[:, ['date_start', 'total_rev_koin']]
+
+
+    # Pre Process adsense revenue
+    df_adsense = df_adsense.groupby(['date_start'])['ESTIMATED_EARNINGS'].sum().reset_index()
+    df_adsense = _date_slice(df_adsense, from_date, to_date, column='date_start')
+
+    # align the cost & every revenue source on the same dates, missing days are 0
+    dates = pd.Index(pd.date_range(from_date, to_date).date, name='date_start')
+    df_spend = df_spend.rename(columns={"date": "date_start"})
+    full_merged = pd.concat([
+        frame.set_index('date_start').reindex(dates, fill_value=0)
+        for frame in (df_spend, revenue_koin_df, df_admob, df_adsense)
+    ], axis=1)
+
+    # calculate total revenue & cost to revenue
+    # ads earnings count in whole rupiah, truncated in float instead of an int round-trip
+    total = (
+        full_merged['total_rev_koin'].to_numpy(dtype=np.float64)
+        + np.trunc(full_merged['Estimated earnings'].to_numpy(dtype=np.float64))
+        + np.trunc(full_merged['ESTIMATED_EARNINGS'].to_numpy(dtype=np.float64))
+    )
+    full_merged['total'] = total
+    total_spend = full_merged['total_spend'].to_numpy(dtype=np.float64)
+    full_merged['cost_to_revenue'] = np.divide(total, total_spend, out=np.zeros_like(total), where=total_spend != 0)
+    return full_merged.reset_index()
+
+
+async def _admob_df(session: AsyncSession, from_date: datetime.date, to_date: datetime.date) -> pd.DataFrame:
+    """
+    Read the admob estimated earnings per day between `from_date` and `to_date`.
+
+    Args:
+        session (AsyncSession): The asynchronous SQLAlchemy session.
+        from_date (datetime.date): The start date of the time period.
+        to_date (datetime.date): The end date of the time period.
+
+    Returns:
+        pandas.DataFrame: The 'date_start' and 'Estimated earnings' (in rupiah, the report stores micros)
+            per day, or a single zero row when there is no data.
+    """
+    # Sum the admob earnings per day in SQL, each row is rounded to 2 decimals before the sum
     query_admob = select(
-        AdmobReportData.date.label("Date"),
-        AdmobReportData.platform.label("Platform"),
-        AdmobReportData.estimated_earnings.label("Estimated earnings"),
-        AdmobReportData.impressions.label("Impressions"),
-        AdmobReportData.observed_ecpm.label("Observed ECPM"),
-        AdmobReportData.impression_ctr.label("Impression CTR"),
-        AdmobReportData.clicks.label("Clicks"),
-        AdmobReportData.ad_requests.label("Ad requests"),
-        AdmobReportData.match_rate.label("Match rate"),
-        AdmobReportData.match_requests.label("Matched requests"),
+        AdmobReportData.date.label("date_start"),
+        func.sum(func.round(AdmobReportData.estimated_earnings / 1000000, 2)).label("Estimated earnings"),
     ).filter(
         AdmobReportData.date.between(from_date, to_date)
-    )
+    ).group_by(AdmobReportData.date)
     result_admob = await session.execute(query_admob)
     data_admob = result_admob.fetchall()
     df_admob = pd.DataFrame(data_admob)
     if df_admob.empty:
         df_admob = pd.DataFrame({
-                "Date": pd.date_range(to_date,to_date).date,
-                "Platform": ["-"],
-                "Estimated earnings": [0],
-                "Impressions": [0],
-                "Observed ECPM": [0],
-                "Impression CTR": [0],
-                "Clicks": [0],
-                "Ad requests": [0],
-                "Match rate": [0],
-                "Matched requests": [0]
+                "date_start": pd.date_range(to_date,to_date).date,
+                "Estimated earnings": [0]
             })
 
-    await asyncio.to_thread(lambda: df_admob.sort_values(by='Date', ascending=True, inplace=True))
-    df_admob['Date'] = await asyncio.to_thread(pd.to_datetime, df_admob['Date'])
-    df_admob["Date"] = await asyncio.to_thread(lambda: df_admob['Date'].dt.date)
-    df_admob['Estimated earnings'] = await asyncio.to_thread(lambda: df_admob['Estimated earnings'] / 1000000)
-    df_admob['Estimated earnings'] = await asyncio.to_thread(lambda: df_admob['Estimated earnings'].round(2))
-    df_loc = await asyncio.to_thread(lambda: df_admob.loc[:, ['Date', 'Estimated earnings']])
-    df_loc['Date'] = await asyncio.to_thread(pd.to_datetime, df_loc['Date'])
-    df_loc['Date'] = await asyncio.to_thread(lambda: df_loc['Date'].dt.date)
-    df_group_admob = await asyncio.to_thread(lambda: df_loc.groupby(['Date'])['Estimated earnings'].sum().reset_index())
-    await asyncio.to_thread(lambda: df_group_admob.rename(columns={'Date':'date_start'}, inplace=True))
-    df_filter_admob = await asyncio.to_thread(lambda: df_group_admob[(df_group_admob['date_start'] >= from_date) & (df_group_admob['date_start'] <= to_date)])
-    if df_filter_admob.empty:
-        df_filter_admob['date_start'] = pd.date_range(from_date, to_date).date
-        df_filter_admob['Estimated earnings'] = 0
+    return df_admob
 
+
+async def _adsense_df(session: AsyncSession, from_date: datetime.date, to_date: datetime.date) -> pd.DataFrame:
+    """
+    Read the adsense report rows between `from_date` and `to_date`.
+
+    Args:
+        session (AsyncSession): The asynchronous SQLAlchemy session.
+        from_date (datetime.date): The start date of the time period.
+        to_date (datetime.date): The end date of the time period.
+
+    Returns:
+        pandas.DataFrame: The adsense report rows, or a single zero row when there is no data.
+    """
     # Pre Process adsense revenue
     query_adsense = select(
-        AdsenseReportData.date.label("DATE"),
+        AdsenseReportData.date.label("date_start"),
         AdsenseReportData.estimated_earnings.label("ESTIMATED_EARNINGS"),
     ).filter(
         AdsenseReportData.date.between(from_date, to_date)
@@ -507,31 +806,44 @@ async def revenue_cost_periods_chart(
     df_adsense = pd.DataFrame(data_adsense)
     if df_adsense.empty:
         df_adsense = pd.DataFrame({
-                "DATE": pd.date_range(to_date,to_date).date,
+                "date_start": pd.date_range(to_date,to_date).date,
                 "ESTIMATED_EARNINGS": [0]
             })
 
-    await asyncio.to_thread(lambda: df_adsense.rename(columns={'DATE':'date_start'}, inplace=True))
-    df_adsense = await asyncio.to_thread(lambda: df_adsense.groupby(['date_start'])['ESTIMATED_EARNINGS'].sum().reset_index())
-    df_adsense['date_start'] = await asyncio.to_thread(pd.to_datetime, df_adsense['date_start'])
-    df_adsense['date_start'] = await asyncio.to_thread(lambda: df_adsense['date_start'].dt.date)
-    df_adsense = await asyncio.to_thread(lambda: df_adsense[(df_adsense['date_start'] >= from_date) & (df_adsense['date_start'] <= to_date)])
-    if df_adsense.empty:
-        df_adsense['date_start'] = pd.date_range(from_date, to_date).date
-        df_adsense['ESTIMATED_EARNINGS'] = 0
-
-    # merge all revenue data and calculate total revenue
-    revenue1_df = await asyncio.to_thread(lambda: pd.merge(revenue_koin_df, df_filter_admob, on='date_start', how='outer'))
-    revenue1_df['date_start'] = await asyncio.to_thread(pd.to_datetime, revenue1_df['date_start'])
-    revenue1_df['date_start'] = await asyncio.to_thread(lambda: revenue1_df['date_start'].dt.date)
-    revenue_df = await asyncio.to_thread(lambda: pd.merge(revenue1_df, df_adsense, on='date_start', how='outer'))
-    revenue_df['date_start'] = await asyncio.to_thread(pd.to_datetime, revenue_df['date_start'])
-    revenue_df['date_start'] = await asyncio.to_thread(lambda: revenue_df['date_start'].dt.date)
-    await asyncio.to_thread(lambda: revenue_df.fillna(0, inplace=True))
-    revenue_df['total'] = await asyncio.to_thread(lambda: revenue_df['total_rev_koin'] + revenue_df['Estimated earnings'].astype(int) + revenue_df['ESTIMATED_EARNINGS'].astype(int))
+    return df_adsense
+
+
+async def revenue_cost_periods_chart(
+        session: AsyncSession,
+        from_date: datetime.date, 
+        to_date: datetime.date, 
+        app_coin_data: pd.DataFrame, 
+        web_coin_data: pd.DataFrame):
+    """
+    Generate a chart showing the revenue, cost, and cost-to-revenue ratio over a specified time period.
+
+    This function retrieves revenue and cost data for the given time period and generates a chart
+    showing the total revenue, total cost, and the cost-to-revenue ratio for each day within the period.
+
+    Args:
+        from_date (str, optional): The start date of the time period in 'YYYY-MM-DD' format. Defaults to None.
+        to_date (str, optional): The end date of the time period in 'YYYY-MM-DD' format. Defaults to None.
+        app_coin_data, web_coin_data: An Dict with revenue and cost data.
+
+    Returns:
+        str: A JSON representation of the generated chart.
+
+    Example:
+        revenue_cost_periods_chart(from_date='2023-01-01', to_date='2023-01-31', object_1=my_data_object)
+    """
     
-    # merge all the data cost & revenue
+    # Read admob, adsense and cost data one after another, the SQLite engine's StaticPool serves
+    # every session from the same connection so separate sessions could not overlap anyway
+    df_admob = await _admob_df(session=session, from_date=from_date, to_date=to_date)
+    df_adsense = await _adsense_df(session=session, from_date=from_date, to_date=to_date)
     df_spend = await cost(session=session, from_date=from_date, to_date=to_date, data="dataframe")
+
+    # Make default cost data if dataframe empty
     if df_spend.empty:
         df_spend = pd.DataFrame({
             "date": pd.date_range(to_date,to_date).date,
@@ -541,18 +853,11 @@ async def revenue_cost_periods_chart(
             "asa": [0],
             "total_spend": [0]
         })
-    
-    await asyncio.to_thread(lambda: df_spend.rename(columns={"date": "date_start"}, inplace=True))
-    df_spend["date_start"] = await asyncio.to_thread(pd.to_datetime, df_spend["date_start"])
-    df_spend["date_start"] = await asyncio.to_thread(lambda: df_spend["date_start"].dt.date)
-    full_merged = await asyncio.to_thread(lambda: pd.merge(df_spend, revenue_df, how='outer', on='date_start'))
-    full_merged['date_start'] = await asyncio.to_thread(pd.to_datetime, full_merged['date_start'])
-    full_merged['date_start'] = await asyncio.to_thread(lambda: full_merged['date_start'].dt.date)
-    await asyncio.to_thread(lambda: full_merged.fillna(0, inplace=True))
-    full_merged['total'] = await asyncio.to_thread(lambda: full_merged['total'].astype(float))
-    full_merged['cost_to_revenue'] = await asyncio.to_thread(lambda: full_merged.total / full_merged.total_spend)
-    await asyncio.to_thread(lambda: full_merged.fillna(0, inplace=True))
-    await asyncio.to_thread(lambda: full_merged.sort_values('date_start', ascending=True, inplace=True))
+
+    # merge all the data cost & revenue in a single thread hop
+    full_merged = await asyncio.to_thread(
+        _preprocess_revenue, from_date, to_date, app_coin_data, web_coin_data, df_admob, df_adsense, df_spend
+    )
 
     # create the chart
     trace1 = go.Bar(
@@ -560,7 +865,7 @@ async def revenue_cost_periods_chart(
         y=full_merged['total_spend'],
         name='Cost',
         yaxis='y',
-        text=full_merged['total_spend'].apply(lambda x: "Rp. {:,.0f}".format((x))),
+        text=thousands_formatter(full_merged['total_spend'], prefix="Rp. "),
         textposition='inside'
     )
 
@@ -580,38 +885,93 @@ async def revenue_cost_periods_chart(
         y=full_merged['total'],
         name='Revenue',
         yaxis='y',
-        text=full_merged['total'].apply(lambda x: "Rp. {:,.0f}".format((x))),
+        text=thousands_formatter(full_merged['total'], prefix="Rp. "),
         textposition='outside'
     )
 
-    # Define the layout with a secondary y-axis
-    layout = go.Layout(
-        title='Cost To Revenue Per Hari',
-        yaxis=dict(
-            title='Cost'
-        ),
-        yaxis2=dict(
-            title='Cost To Revenue',
-            overlaying='y',
-            side='right',
-            # Set the y-axis format to be a percentage with 2 decimal places
-            tickformat='.0%'
-        )
+    # Combine the traces and the shared secondary y-axis layout into a Figure object
+    fig = go.Figure(data=[trace1, trace2, trace3], layout=_DAILY_COST_REVENUE_LAYOUT)
+
+    chart = await asyncio.to_thread(figure_to_json, fig)
+
+    return chart
+
+
+async def _read_csv_bytes(path: str, tail_rows: int = None, block_size: int = 64 * 1024) -> bytes:
+    """
+    Read the raw bytes of a CSV file with aiofiles, so the disk wait does not hold a parse thread.
+
+    With `tail_rows`, only the header and the last `block_size` bytes are read; the partial line at the
+    start of that block is dropped.
+
+    Args:
+        path (str): The path of the CSV file.
+        tail_rows (int, optional): Only read the end of the file. Defaults to None, the whole file.
+        block_size (int, optional): The number of bytes to read from the end of the file. Defaults to 64 KiB.
+
+    Returns:
+        bytes: The CSV header and rows.
+    """
+    async with aiofiles.open(path, 'rb') as file:
+        if tail_rows is None:
+            return await file.read()
+        header = await file.readline()
+        start = max(len(header), os.fstat(file.fileno()).st_size - block_size)
+        await file.seek(start)
+        tail = await file.read()
+
+    if start > len(header):
+        tail = tail[tail.find(b'\n') + 1:]
+    return header + tail
+
+
+def _parse_csv(data: bytes, tail_rows: int = None, dtype: dict = None) -> pd.DataFrame:
+    """
+    Parse CSV bytes into a DataFrame with the multithreaded pyarrow CSV reader.
+
+    Args:
+        data (bytes): The CSV header and rows.
+        tail_rows (int, optional): Only keep the last `tail_rows` rows. Defaults to None, all rows.
+        dtype (dict, optional): The numpy dtypes of columns, applied while parsing. Defaults to None.
+
+    Returns:
+        pandas.DataFrame: The parsed CSV.
+    """
+    column_types = {column: pa.from_numpy_dtype(np.dtype(t)) for column, t in (dtype or {}).items()}
+    table = pa_csv.read_csv(
+        pa.BufferReader(data),
+        parse_options=pa_csv.ParseOptions(delimiter=','),
+        convert_options=pa_csv.ConvertOptions(column_types=column_types)
     )
+    df = table.to_pandas()
+    if tail_rows is not None:
+        df = df.tail(tail_rows).reset_index(drop=True)
+    return df
 
-    # Combine the traces and layout into a Figure object
-    fig = go.Figure(data=[trace1, trace2, trace3], layout=layout)
 
-    fig.update_layout(barmode='stack', legend=dict(
-    yanchor="top",
-    y=0.99,
-    xanchor="left",
-    x=0.01
-    ))
+async def _cached_read_csv(path: str, tail_rows: int = None, dtype: dict = None) -> pd.DataFrame:
+    """
+    Read a CSV file, reusing the parsed DataFrame while the file's modification time is unchanged.
 
-    chart = await asyncio.to_thread(json.dumps, fig, cls=plotly.utils.PlotlyJSONEncoder)
+    A warm hit is a single stat on the event loop; otherwise the file is read with aiofiles and
+    only the parse runs in a worker thread.
 
-    return chart
+    Args:
+        path (str): The path of the CSV file.
+        tail_rows (int, optional): Only read the last `tail_rows` rows. Defaults to None, the whole file.
+        dtype (dict, optional): The column dtypes, parsed directly at read time. Defaults to None.
+
+    Returns:
+        pandas.DataFrame: The parsed CSV, shared between callers and not to be modified in place.
+    """
+    mtime = os.stat(path).st_mtime_ns
+    cached = _CSV_CACHE.get((path, tail_rows))
+    if cached is None or cached[0] != mtime:
+        data = await _read_csv_bytes(path, tail_rows)
+        df = await asyncio.to_thread(_parse_csv, data, tail_rows, dtype)
+        cached = (mtime, df)
+        _CSV_CACHE[(path, tail_rows)] = cached
+    return cached[1]
 
 
 async def revenue_cost_chart():
@@ -629,68 +989,65 @@ async def revenue_cost_chart():
     """
 
     # initiate the data
-    read_csv = await asyncio.to_thread(pd.read_csv, './csv/cost_revenue.csv', delimiter=',')
-    df = pd.DataFrame(read_csv)
-    df['revenue_to_cost'] = await asyncio.to_thread(pd.to_numeric, df['revenue_to_cost'])
+    df = await _cached_read_csv('./csv/cost_revenue.csv', 7, COST_REVENUE_DTYPES)
 
     # create the chart
     trace1 = go.Bar(
-        x=df['date'][-7:],
-        y=df['cost'][-7:],
+        x=df['date'],
+        y=df['cost'],
         name='Cost',
         yaxis='y',
-        text=df['cost'][-7:].apply(lambda x: "Rp. {:,.0f}".format((x))),
+        text=thousands_formatter(df['cost'], prefix="Rp. "),
         textposition='inside'
     )
 
     trace2 = go.Scatter(
-        x=df['date'][-7:],
-        y=df['revenue_to_cost'][-7:],
+        x=df['date'],
+        y=df['revenue_to_cost'],
         name='Cost To Revenue',
         yaxis='y2',
         # Set the y-axis format to be a percentage with 2 decimal places
         hovertemplate='%{y:.2%}',
-        text=df['revenue_to_cost'][-7:],
+        text=df['revenue_to_cost'],
         textposition='middle center'
     )
 
     trace3 = go.Bar(
-        x=df['date'][-7:],
-        y=df['revenue'][-7:],
+        x=df['date'],
+        y=df['revenue'],
         name='Revenue',
         yaxis='y',
-        text=df['revenue'][-7:].apply(lambda x: "Rp. {:,.0f}".format((x))),
+        text=thousands_formatter(df['revenue'], prefix="Rp. "),
         textposition='outside'
     )
 
-    # Define the layout with a secondary y-axis
-    layout = go.Layout(
-        title='Cost To Revenue Per Minggu',
-        yaxis=dict(
-            title='Cost'
-        ),
-        yaxis2=dict(
-            title='Cost To Revenue',
-            overlaying='y',
-            side='right',
-            # Set the y-axis format to be a percentage with 2 decimal places
-            tickformat='.0%'
-        )
-    )
+    # Combine the traces and the shared secondary y-axis layout into a Figure object
+    fig = go.Figure(data=[trace1, trace2, trace3], layout=_WEEKLY_COST_REVENUE_LAYOUT)
 
-    # Combine the traces and layout into a Figure object
-    fig = go.Figure(data=[trace1, trace2, trace3], layout=layout)
+    chart = await asyncio.to_thread(figure_to_json, fig)
 
-    fig.update_layout(barmode='stack', legend=dict(
-    yanchor="top",
-    y=0.99,
-    xanchor="left",
-    x=0.01
-    ))
+    return chart
 
-    chart = await asyncio.to_thread(json.dumps, fig, cls=plotly.utils.PlotlyJSONEncoder)
 
-    return chart
+def _group_payment_channel(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Sum the total transaksi per upper-cased payment channel.
+
+    The channel is grouped as a categorical, so the groupby hashes integer codes and the upper-casing
+    only runs once per distinct channel instead of once per row.
+
+    Args:
+        df (pd.DataFrame): The 'payment_channel' and 'total_transaksi' rows of app and web.
+
+    Returns:
+        pandas.DataFrame: The 'payment_channel' and 'total_transaksi' per channel, in order of first appearance.
+    """
+    channel = df['payment_channel'].astype('category')
+    upper_codes, upper_categories = pd.factorize(channel.cat.categories.str.upper())
+    codes = channel.cat.codes.to_numpy()
+    codes = np.where(codes >= 0, upper_codes[codes], -1)
+    df = df.assign(payment_channel=pd.Categorical.from_codes(codes, categories=upper_categories))
+    return df.groupby('payment_channel', sort=False, observed=True, as_index=False)['total_transaksi'].sum()
 
 
 async def payment_channel(app_coin_data: pd.DataFrame, web_coin_data: pd.DataFrame):
@@ -712,29 +1069,27 @@ async def payment_channel(app_coin_data: pd.DataFrame, web_coin_data: pd.DataFra
         payment_channel(from_date=date(2024, 1, 1), to_date=date(2024, 12, 31), object_1=my_object, source='app')
     """
 
-    # Initiate app web data and merge it
-    df_app = app_coin_data['payment_channel']
-    df_app = pd.DataFrame(df_app)
-    df_web = web_coin_data['payment_channel']
-    df_web = pd.DataFrame(df_web)
-    df = await asyncio.to_thread(lambda: pd.merge(df_app, df_web, on=['payment_channel', 'total_transaksi'], how='outer'))
+    # Stack the app & web {column: array} mappings into one frame
+    app_channel, web_channel = app_coin_data['payment_channel'], web_coin_data['payment_channel']
+    df = pd.DataFrame({
+        column: np.concatenate([app_channel[column], web_channel[column]])
+        for column in ('payment_channel', 'total_transaksi')
+    })
 
-    # group the data by payment channel and sum to total transaksi
-    df = await asyncio.to_thread(lambda: df.groupby(['payment_channel'])['total_transaksi'].sum().reset_index())
+    # group the data by upper-cased payment channel and sum to total transaksi
+    df = await asyncio.to_thread(_group_payment_channel, df)
 
     if df.empty:
         df['payment_channel'] = '-'
         df['total_transaksi'] = 0
-    
-    df['payment_channel'] = df['payment_channel'].str.upper()
 
-    # Create the chart
+    # Create the chart from the 10 channels with the highest combined total
+    top = df.nlargest(10, 'total_transaksi')
     fig = go.Figure(
-        go.Pie(labels=df[0:10].payment_channel, values=df[0:10].total_transaksi)
+        go.Pie(labels=top.payment_channel, values=top.total_transaksi),
+        layout=_PAYMENT_CHANNEL_LAYOUT
     )
 
-    fig.update_layout(title='Payment Channel')
-
-    chart = await asyncio.to_thread(json.dumps, fig, cls=plotly.utils.PlotlyJSONEncoder)
+    chart = await asyncio.to_thread(figure_to_json, fig)
 
     return chart
@@ -1,19 +1,19 @@
+import numpy as np
 import pandas as pd
-import json
-import plotly
 import asyncio
 import plotly.graph_objects as go
 import plotly.express as px
 from dateutil.relativedelta import relativedelta
 from datetime import datetime, timedelta
-from sqlalchemy import select, func
-from sqlalchemy.orm import aliased
+from functools import lru_cache
+from sqlalchemy import Date, String, bindparam, select, func
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.db.models.coin import GooddreamerTransaction as gt
 from app.db.models.data_source import  ModelHasSources as mhs, Sources as s
 from app.db.models.user import GooddreamerUserWalletItem as guwi, GooddreamerUserData as gud
 from app.db.models.novel import GooddreamerUserChapterProgression as gucp, GooddreamerChapterTransaction as gct, GooddreamerUserChapterAdmob as guca
+from app.utils.common_utils import figure_to_json
 
 
 def get_date_range(days, period='days', months=3):
@@ -45,36 +45,28 @@ def get_date_range(days, period='days', months=3):
     return start_date.date(), end_date.date()
 
 
-def generate_event_data_subquery(
-        event_name: str, 
-        from_date: datetime.date, 
-        to_date: datetime.date, 
-        period: str, 
-        source: str = 'all'):
+@lru_cache(maxsize=None)
+def _event_data_template(event_name: str, source: str = 'all'):
     """
-    Generates a subquery for event data based on the given event name, date range, period,
-    and optionally a specific data source.
+    Builds the event data select for an event name and data source once, with the date range and
+    period left as `from_date`, `to_date` and `period` bind parameters.
 
     Parameters:
-        event_name (str): The name of the event.
-            - 'User Read Chapter', 
-            - 'User Buy Chapter With Coin
-            - 'User Buy Chpater With AdsCoin
-            - 'User Buy Chapter With Ads'
-            - 'User Buy Coin'), default is an empty string.
-        from_date (datetime.date): The start date of the date range in 'YYYY-MM-DD' format.
-        to_date (datetime.date): The end date of the date range in 'YYYY-MM-DD' format.
-        period (str): The period for grouping the event data, '%Y-%m-01' for monthly, '%Y-%m-%d' for daily.
+        event_name (str): The name of the event, see `generate_event_data_subquery`.
         source (str, optional): The specific data source ('all', 'app', 'web'), default is 'all'.
 
     Returns:
-        SQLAlchemy subquery: A subquery containing event data based on the given parameters.
+        SQLAlchemy Select: The event data select, to be bound with `.params(...)`.
     """
+    from_date = bindparam('from_date', type_=Date)
+    to_date = bindparam('to_date', type_=Date)
+    period = bindparam('period', type_=String)
+
     # Initialize query based on event name
     if event_name == 'User Read Chapter':
         # Query for User Read Chapter event
         query = select(
-            gucp.user_id.distinct().label('user_id'),
+            gucp.user_id.label('user_id'),
             func.date_format(gucp.updated_at, period).label('event_date')
         ).join(
             gucp.gooddreamer_user_data
@@ -95,7 +87,7 @@ def generate_event_data_subquery(
     elif event_name == 'User Buy Chapter With Coin':
         # Query for User Buy Chapter With Coin event
         query = select(
-            gct.user_id.distinct().label('user_id'),
+            gct.user_id.label('user_id'),
             func.date_format(gct.created_at, period).label('event_date')
         ).join(
             gct.gooddreamer_user_wallet_item
@@ -117,7 +109,7 @@ def generate_event_data_subquery(
     elif event_name == 'User Buy Chapter With AdsCoin':
         # Query for User Buy Chapter With AdsCoin event
         query = select(
-            gct.user_id.distinct().label('user_id'),
+            gct.user_id.label('user_id'),
             func.date_format(gct.created_at, period).label('event_date')
         ).join(
             gct.gooddreamer_user_wallet_item
@@ -139,7 +131,7 @@ def generate_event_data_subquery(
     elif event_name == 'User Buy Chapter With Ads':
         # Query for User Buy Chapter With Ads event
         query = select(
-            guca.user_id.distinct().label('user_id'),
+            guca.user_id.label('user_id'),
             func.date_format(guca.created_at, period).label('event_date')
         ).filter(
             func.date(guca.created_at).between(from_date, to_date)
@@ -157,7 +149,7 @@ def generate_event_data_subquery(
     elif event_name == 'User Buy Coin':
         # Query for User Buy Coin event
         query = select(
-            gt.user_id.distinct().label('user_id'),
+            gt.user_id.label('user_id'),
             func.date_format(gt.created_at, period).label('event_date')
         ).filter(
             func.date(gt.created_at).between(from_date, to_date),
@@ -174,7 +166,40 @@ def generate_event_data_subquery(
                 s.name == source
             )
 
-    return query.subquery()
+    return query
+
+
+def generate_event_data_subquery(
+        event_name: str, 
+        from_date: datetime.date, 
+        to_date: datetime.date, 
+        period: str, 
+        source: str = 'all'):
+    """
+    Generates a subquery for event data based on the given event name, date range, period,
+    and optionally a specific data source.
+
+    Parameters:
+        event_name (str): The name of the event.
+            - 'User Read Chapter', 
+            - 'User Buy Chapter With Coin
+            - 'User Buy Chpater With AdsCoin
+            - 'User Buy Chapter With Ads'
+            - 'User Buy Coin'), default is an empty string.
+        from_date (datetime.date): The start date of the date range in 'YYYY-MM-DD' format.
+        to_date (datetime.date): The end date of the date range in 'YYYY-MM-DD' format.
+        period (str): The period for grouping the event data, '%Y-%m-01' for monthly, '%Y-%m-%d' for daily.
+        source (str, optional): The specific data source ('all', 'app', 'web'), default is 'all'.
+
+    Returns:
+        SQLAlchemy subquery: A subquery containing event data based on the given parameters.
+
+    Note:
+        The select itself is built once per (event_name, source) by `_event_data_template`;
+        only the date range and period are bound here.
+    """
+    query = _event_data_template(event_name, source)
+    return query.params(from_date=from_date, to_date=to_date, period=period).subquery()
 
 
 async def data_query(
@@ -205,66 +230,39 @@ async def data_query(
                    subsequent event dates, and total users retained for each event.
     """
     # Generate event data subquery based on event name, date range, period, and source
-    event_data_subquery = await asyncio.to_thread(generate_event_data_subquery, event_name, from_date, to_date, period, source)
-
-    # Aliases for the subquery to compare events for retention calculation
-    ed_1 = aliased(event_data_subquery)
-    ed_2 = aliased(event_data_subquery)
-
-    # Subquery to calculate retention rates
-    retention_data_subquery = select(
-        ed_1.c.user_id.label('user_id'),
-        func.date_format(ed_1.c.event_date, period).label('first_event_date'),
-        func.min(func.date_format(ed_2.c.event_date, period)).over(
-            partition_by=ed_1.c.user_id,
-            order_by=ed_2.c.event_date,
-            rows=(0, None)
-        ).label('after_event_date')
-    ).outerjoin(
-        ed_2, ed_1.c.user_id == ed_2.c.user_id
-    ).filter(
-        func.date_format(ed_2.c.event_date, period) > func.date_format(ed_1.c.event_date, period)
-    ).subquery()
-
-    # Subquery to aggregate retention data
-    retention_table_subquery = select(
-        retention_data_subquery.c.first_event_date.label('first_event_date'),
-        (select(
-            func.count(event_data_subquery.c.user_id)
-        )).filter(
-            func.date_format(event_data_subquery.c.event_date, period) == retention_data_subquery.c.first_event_date
-        ).label('total_user_first_event'),
-        retention_data_subquery.c.after_event_date.label('after_event_date'),
-        func.count(retention_data_subquery.c.user_id).label('total_user_retention')
-    ).group_by(
-        'first_event_date',
-        'after_event_date'
-    ).subquery()
-
-    # Subquery to aggregate first event data
+    event_data_subquery = generate_event_data_subquery(event_name, from_date, to_date, period, source)
+
+    # Tag every event with the user's first event period in a single window pass
+    event_data = select(
+        event_data_subquery.c.user_id.label('user_id'),
+        event_data_subquery.c.event_date.label('after_event_date'),
+        func.min(event_data_subquery.c.event_date).over(
+            partition_by=event_data_subquery.c.user_id
+        ).label('first_event_date')
+    ).cte('event_data')
+
+    # Cohort size: the users whose first event falls in each period
     first_event_data_subquery = select(
-        func.date_format(event_data_subquery.c.event_date, period).label('first_event_date'),
-        func.count(event_data_subquery.c.user_id).label('total_user_first_event'),
-        func.date_format(event_data_subquery.c.event_date, period).label('after_event_date'),
-        func.count(event_data_subquery.c.user_id).label('total_user_retention')
+        event_data.c.first_event_date.label('first_event_date'),
+        func.count(event_data.c.user_id.distinct()).label('total_user_first_event')
+    ).filter(
+        event_data.c.after_event_date == event_data.c.first_event_date
     ).group_by(
-        'first_event_date',
-        'after_event_date'
+        event_data.c.first_event_date
     ).subquery()
 
-    # Final query to combine retention and first event data
+    # Users of each cohort active in each following period, the first period included
     query = select(
-        first_event_data_subquery.c.first_event_date.label('first_event_date'),
+        event_data.c.first_event_date.label('first_event_date'),
         first_event_data_subquery.c.total_user_first_event.label('total_user_first_event'),
-        first_event_data_subquery.c.after_event_date.label('after_event_date'),
-        first_event_data_subquery.c.total_user_retention.label('total_user_retention')
-    ).union_all(
-        select(
-            retention_table_subquery.c.first_event_date.label('first_event_date'),
-            retention_table_subquery.c.total_user_first_event.label('total_user_first_event'),
-            retention_table_subquery.c.after_event_date.label('after_event_date'),
-            retention_table_subquery.c.total_user_retention.label('total_user_retention')
-        )
+        event_data.c.after_event_date.label('after_event_date'),
+        func.count(event_data.c.user_id.distinct()).label('total_user_retention')
+    ).join(
+        first_event_data_subquery, first_event_data_subquery.c.first_event_date == event_data.c.first_event_date
+    ).group_by(
+        event_data.c.first_event_date,
+        first_event_data_subquery.c.total_user_first_event,
+        event_data.c.after_event_date
     ).order_by(
         'first_event_date',
         'after_event_date'
@@ -287,6 +285,33 @@ async def data_query(
     return df
 
 
+def _compute_retention_days(df: pd.DataFrame, period: str) -> pd.DataFrame:
+    """
+    Converts the event date columns to datetime and calculates the retention period of each row.
+
+    Parameters:
+        df (DataFrame): The retention data returned by `data_query`.
+        period (str): The period of the event dates, '%Y-%m-01' for monthly, '%Y-%m-%d' for daily.
+
+    Returns:
+        DataFrame: The data with a 'retention_days' column, in days for a daily period and in months otherwise.
+    """
+    # Convert the date columns to datetime format
+    df['first_event_date'] = pd.to_datetime(df['first_event_date'])
+    df['after_event_date'] = pd.to_datetime(df['after_event_date'])
+
+    if period == '%Y-%m-%d':
+        # Calculate retention days as the difference between after_event_date and first_event_date
+        df['retention_days'] = (df['after_event_date'] - df['first_event_date']).dt.days.astype(np.int32)
+    else:
+        # Calculate retention as the difference in months, plain integer arithmetic on year & month
+        after_month = df['after_event_date'].dt.year * 12 + df['after_event_date'].dt.month
+        first_month = df['first_event_date'].dt.year * 12 + df['first_event_date'].dt.month
+        df['retention_days'] = after_month - first_month
+
+    return df
+
+
 async def cohort_df(
         session: AsyncSession,
         from_date: datetime.date,
@@ -319,34 +344,26 @@ async def cohort_df(
     # Retrieve data using data_query function
     df = await data_query(session=session, from_date=from_date, to_date=to_date, period=period, source=source, event_name=event_name)
 
-    # Calculate the retention days
-    if period == '%Y-%m-%d':
-        # Convert the date columns to datetime format
-        df['first_event_date'] = await asyncio.to_thread(pd.to_datetime, df['first_event_date'])
-        df['after_event_date'] = await asyncio.to_thread(pd.to_datetime, df['after_event_date'])
-        # Calculate retention days as the difference between after_event_date and first_event_date
-        df['retention_days'] = await asyncio.to_thread(lambda: (df['after_event_date'] - df['first_event_date']).dt.days)
-    else:
-        # Convert the date columns to datetime format
-        df['first_event_date'] = await asyncio.to_thread(pd.to_datetime, df['first_event_date'])
-        df['after_event_date'] = await asyncio.to_thread(pd.to_datetime, df['after_event_date'])
-        # Calculate retention days as the difference in months between after_event_date and first_event_date
-        df['retention_days'] = await asyncio.to_thread(lambda: df['after_event_date'].dt.to_period('M').astype(int) - df['first_event_date'].dt.to_period('M').astype(int))
-
-    # Pivot the table to create the retention matrix
-    retention_matrix = df.pivot_table(index='first_event_date', columns='retention_days', values='total_user_retention')
-    
+    # Calculate the retention days in a single thread hop
+    df = await asyncio.to_thread(_compute_retention_days, df, period)
+
+    # Scatter the rows into a zero-filled retention matrix, cohorts without a period stay 0
+    row_codes, row_uniques = pd.factorize(df['first_event_date'], sort=True)
+    col_codes, col_uniques = pd.factorize(df['retention_days'], sort=True)
+    matrix = np.zeros((len(row_uniques), len(col_uniques)), dtype=np.float64)
+    np.add.at(matrix, (row_codes, col_codes), df['total_user_retention'].to_numpy(dtype=np.float64))
+
     # Calculate the retention rate by dividing by the total number of users on the first event date
     if data == "float":
-        for column in retention_matrix.columns:
-            retention_matrix[column] = retention_matrix[column] / df.groupby('first_event_date')['total_user_first_event'].first()
-    else:
-        pass
-
-    # Fill NaN values with 0 for better readability
-    retention_matrix = retention_matrix.fillna(0)
-    
-    return retention_matrix
+        cohort_size = np.zeros(len(row_uniques), dtype=np.float64)
+        cohort_size[row_codes] = df['total_user_first_event'].to_numpy(dtype=np.float64)
+        matrix /= cohort_size[:, None]
+
+    return pd.DataFrame(
+        matrix,
+        index=pd.Index(row_uniques, name='first_event_date'),
+        columns=pd.Index(col_uniques, name='retention_days')
+    )
 
 
 async def cohort_table(
@@ -398,13 +415,16 @@ async def cohort_table(
     header_values = df.columns.tolist()
     header_values[0] = f'{period_type} Retention'
 
-    # Create a list of cell values
-    cell_values = [df[col].tolist() for col in df.columns]
+    # Create a list of cell values; rates only need 4 decimals for the '.0%' format
+    # and counts are whole numbers, so trim them before they are serialized
+    values = df.iloc[:, 1:].to_numpy(dtype=np.float64)
+    values = values.round(4) if data == "float" else values.astype(np.int64)
+    cell_values = [df.iloc[:, 0].tolist()] + values.T.tolist()
     
     # Calculate global min and max values for color scaling
-    flat_values = [item for sublist in cell_values[1:] for item in sublist]
-    global_min = min(flat_values)
-    global_max = max(flat_values)
+    columns = values.T.astype(np.float64)
+    global_min = columns.min()
+    global_max = columns.max()
 
     # Define color scale from white (min) to medium green (max)
     color_scale = ['rgba(152, 251, 152, 0)', 'rgba(0, 128, 0, 1)']
@@ -421,11 +441,9 @@ async def cohort_table(
     if global_min == global_max:
         fill_color = [[color_scale[0]] * len(df)] + [[color_scale[0]] * len(df) for _ in cell_values[1:]]
     else:
-        fill_color = [
-            ['#696969'] * len(df)] + [
-            [f'rgba(0, 128, 0, {(value - global_min) / (global_max - global_min)})' if value > 0 else color_scale[0] for value in column]
-            for column in cell_values[1:]
-        ]
+        alpha = ((columns - global_min) / (global_max - global_min)).round(3)
+        colors = np.char.add(np.char.add('rgba(0, 128, 0, ', alpha.astype(str)), ')')
+        fill_color = [['#696969'] * len(df)] + np.where(columns > 0, colors, color_scale[0]).tolist()
     
     # Set 'Periods' column color to match header color
     fill_color[0] = ['#696969'] * len(df)
@@ -471,11 +489,32 @@ async def cohort_table(
     )
 
     # Convert figure to JSON
-    chart = await asyncio.to_thread(json.dumps, fig, cls=plotly.utils.PlotlyJSONEncoder)
+    chart = await asyncio.to_thread(figure_to_json, fig)
 
     return chart
 
 
+def _mean_retention(df: pd.DataFrame) -> pd.Series:
+    """
+    Averages the retention rate of every period across the cohorts, in percent.
+
+    Equivalent to `(df.div(df['0'], axis=0) * 100).mean(axis=0)`, but computed as one vector-matrix
+    product of the inverted cohort sizes with the matrix, without materializing the rate matrix.
+    Cohorts with a size of 0 are skipped.
+
+    Parameters:
+        df (DataFrame): The cohort matrix returned by `cohort_df`, with string column names.
+
+    Returns:
+        Series: The average retention rate per period.
+    """
+    matrix = df.to_numpy(dtype=np.float64)
+    cohort_size = df['0'].to_numpy(dtype=np.float64)
+    valid = cohort_size != 0
+    average = (1 / cohort_size[valid]) @ matrix[valid] / valid.sum() * 100
+    return pd.Series(average, index=df.columns)
+
+
 async def retention_chart(
         session: AsyncSession,
         from_date: datetime.date,
@@ -514,11 +553,8 @@ async def retention_chart(
     # Ensure column names are strings
     df.columns = df.columns.map(str)
     
-    # Calculate the retention rate for each period
-    retention_rates = df.div(df['0'], axis=0) * 100
-
     # Compute the average retention rate for each period across all days
-    average_retention = retention_rates.mean(axis=0)
+    average_retention = await asyncio.to_thread(_mean_retention, df)
 
     # Create a DataFrame from the average retention rates for plotting
     average_retention_df = average_retention.reset_index()
@@ -531,6 +567,6 @@ async def retention_chart(
                 labels={'Period': f'{period_type} Retention', 'Overall Retention Rate': f'{period_type} Retention Rate (%)'})
     
     # Convert figure to JSON
-    chart = await asyncio.to_thread(json.dumps, fig, cls=plotly.utils.PlotlyJSONEncoder)
+    chart = await asyncio.to_thread(figure_to_json, fig)
 
     return chart
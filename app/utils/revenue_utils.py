@@ -3,7 +3,6 @@ import json
 import numpy as np
 import pandas as pd
 import asyncio
-import plotly
 import plotly.graph_objects as go
 import re
 from typing import Union, Dict
@@ -12,12 +11,14 @@ from sqlalchemy.exc import OperationalError
 from sqlalchemy.future import select
 from sqlalchemy import asc
 from datetime import datetime, timedelta
-from sqlalchemy import case as Case, func
+from sqlalchemy import case as Case, func, literal, null
+from app.db.session import async_session_maker
 from app.db.models.coin import GooddreamerTransaction, GooddreamerTransactionDetails, GooddreamerPaymentData
 from app.db.models.acquisition import AdmobReportData, AdsenseReportData
 from app.db.models.novel import GooddreamerUserChapterAdmob
 from app.db.models.user import GooddreamerUserData
 from app.db.models.data_source import  Sources, ModelHasSources
+from app.utils.common_utils import calculate_growth_percentage, figure_to_json
 pd.options.mode.copy_on_write = True
 pd.set_option('future.no_silent_downcasting', True)
 
@@ -25,6 +26,140 @@ pd.set_option('future.no_silent_downcasting', True)
 # logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+_DAY_NAMES = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday']
+
+# Intermediate results each revenue_data metric depends on, so a filtered request only pays for
+# the aggregates it actually reads
+_METRIC_DEPS = {
+    'coin_count': {'status'},
+    'coin_unique': {'purchases'},
+    'count_coin_expired': {'status'},
+    'count_coin_success': {'status'},
+    'count_coin_total': {'status'},
+    'revenue': {'status'},
+    'gross_revenue': {'status'},
+    'arpu': {'status', 'purchases'},
+    'arpt': {'status'},
+    'first_purchase': {'purchases'},
+    'return_purchase': {'purchases'},
+    'unique_user': {'chapter_users'},
+    'Estimated earnings': {'ads'},
+    'Observed ECPM': {'ads'},
+    'Impressions': {'ads'},
+    'Estimated_impressions': {'ads'},
+    'revenue_per_user': {'ads', 'chapter_users'},
+    'impression_per_user': {'ads', 'chapter_users'},
+    'overall_revenue': {'status', 'ads'},
+}
+
+# Placeholder frames used when a revenue source has no rows, None marks the date columns that
+# are filled with the end date of the requested range
+_EMPTY_COIN = {
+    'id': ['-'],
+    'user_id': [0],
+    "install_date": None,
+    "register_date": None,
+    "fullname": ["-"],
+    "email": ["-"],
+    "transaction_date": None,
+    "coin_value": [0],
+    "revenue": [0],
+    "amount": [0],
+    "bank_code": [0],
+    "payment_gateway": ["-"],
+    "payment_channel": ["-"],
+    "status": ["-"],
+    "payment_date": None,
+    "source": ["-"]
+}
+_EMPTY_ADMOB = {
+    "Date": None,
+    "Platform": ["-"],
+    "Estimated earnings": [0],
+    "Observed ECPM": [0],
+    "Impressions": [0],
+    "Clicks": [0],
+    "Ad requests": [0],
+    "Matched requests": [0],
+    "Impression CTR": [0],
+    "Match rate": [0],
+    "Show rate": [0]
+}
+# AdMob and Adsense are read together in one UNION ALL, these are the columns each report keeps
+# once the combined rows are split back apart
+_ADMOB_COLUMNS = [
+    "Date", "Platform", "Estimated earnings", "Impressions", "Observed ECPM", "Impression CTR",
+    "Clicks", "Ad requests", "Match rate", "Matched requests"
+]
+_ADSENSE_COLUMNS = [
+    "Date", "Platform", "Ad Placement Name", "Estimated earnings", "Impressions", "Clicks",
+    "Ad requests", "Matched requests", "Impression RPM", "Impression CTR"
+]
+_EMPTY_ADSENSE = {
+    "Date": None,
+    "Ad Placement name": ["-"],
+    "Platform": ["-"],
+    "Estimated earnings": [0],
+    "Impression RPM": [0],
+    "Impressions": [0],
+    "Clicks": [0],
+    "Ad requests": [0],
+    "Matched requests": [0],
+    "Impression CTR": [0],
+    "Match rate": [0],
+    "Show rate": [0]
+}
+_EMPTY_CHAPTER_ADS = {
+    "tanggal": None,
+    "user_id": [0],
+    "source": ["-"],
+    "chapter_count": [0]
+}
+
+
+def _empty_frame(template: dict, to_date: datetime.date) -> pd.DataFrame:
+    """
+    Builds the single row placeholder frame of a template, dated `to_date`.
+
+    Args:
+        template (dict): One of the `_EMPTY_*` templates.
+        to_date (datetime.date): The end date of the requested range.
+
+    Returns:
+        pd.DataFrame: The placeholder frame.
+    """
+    single_date = np.array([to_date], dtype=object)
+    return pd.DataFrame({column: single_date if value is None else value for column, value in template.items()})
+
+
+def _purchase_counts(user_ids: np.ndarray) -> tuple:
+    """
+    Counts the buyers, first time buyers and returning buyers in one pass over the paid user ids.
+
+    Args:
+        user_ids (np.ndarray): The user id of every paid transaction.
+
+    Returns:
+        tuple: (unique buyers, buyers with one purchase, buyers with more than one purchase).
+    """
+    codes, uniques = pd.factorize(user_ids)
+    purchases = np.bincount(codes[codes >= 0], minlength=len(uniques))
+    first_purchase = int(np.count_nonzero(purchases == 1))
+    return len(uniques), first_purchase, len(uniques) - first_purchase
+
+
+def _columns(df: pd.DataFrame) -> Dict[str, np.ndarray]:
+    """
+    Converts a frame to a {column: array} mapping, which pd.DataFrame rebuilds without boxing every cell.
+
+    Args:
+        df (pd.DataFrame): The frame to convert.
+
+    Returns:
+        dict: The column arrays of the frame, in row order.
+    """
+    return {column: df[column].to_numpy() for column in df.columns}
+
 
 class RevenueData:
     """
@@ -62,6 +197,9 @@ class RevenueData:
         self.df_admob = pd.DataFrame()
         self.df_adsense = pd.DataFrame()
         self.df_chapter_ads = pd.DataFrame()
+        self._defaults_applied = False
+        self._dates_processed = False
+        self._revenue_data_cache = {}
 
     @classmethod
     async def load_data(
@@ -92,15 +230,24 @@ class RevenueData:
         """
         Asynchronously fetches revenue data from the database for each revenue type and stores it in class attributes.
 
-        This method retrieves different types of revenue data, such as 'coin_data', 'admob_data', 'adsense_data', 
-        and 'chapter_ads_data' within the specified date range, and stores the results as pandas DataFrames.
+        This method retrieves different types of revenue data, such as 'coin_data', 'ads_data' and
+        'chapter_ads_data' within the specified date range, and stores the results as pandas DataFrames.
+        The two MySQL reads run concurrently, the coin data on `self.session` and the chapter ads data on a
+        second session from `async_session_maker` (an AsyncSession is not safe for concurrent use). The
+        SQLite engine uses a StaticPool, a single connection every session would share, so the AdMob and
+        Adsense data is read in one query on `self.sqlite_session`.
         """
-        await self._read_db(from_date=self.from_date, to_date=self.to_date, data="coin_data")
-        await self._read_db(from_date=self.from_date, to_date=self.to_date, data="admob_data")
-        await self._read_db(from_date=self.from_date, to_date=self.to_date, data="adsense_data")
-        await self._read_db(from_date=self.from_date, to_date=self.to_date, data="chapter_ads_data")
+        async def read_chapter_ads():
+            async with async_session_maker() as session:
+                await self._read_db(from_date=self.from_date, to_date=self.to_date, data="chapter_ads_data", session=session)
+
+        await asyncio.gather(
+            self._read_db(from_date=self.from_date, to_date=self.to_date, data="coin_data"),
+            read_chapter_ads(),
+            self._read_db(from_date=self.from_date, to_date=self.to_date, data="ads_data")
+        )
 
-    async def _read_db(self, from_date: datetime.date, to_date: datetime.date, data: str = "coin_data"):
+    async def _read_db(self, from_date: datetime.date, to_date: datetime.date, data: str = "coin_data", session: AsyncSession = None):
         """
         Asynchronously reads revenue data from the database and converts it into a pandas DataFrame.
 
@@ -112,9 +259,10 @@ class RevenueData:
             to_date (datetime.date): The end date of the data retrieval period.
             data (str): The type of revenue data to fetch, which could be one of:
                         - 'coin_data' for Coin revenue data
-                        - 'admob_data' for AdMob revenue data
-                        - 'adsense_data' for Adsense revenue data
+                        - 'ads_data' for the AdMob and Adsense revenue data
                         - 'chapter_ads_data' for Chapter Ads revenue data
+            session (AsyncSession, optional): Session to query with. Defaults to `self.session`, or
+                `self.sqlite_session` for the AdMob and Adsense data.
 
         Returns:
             None: The resulting data is stored in corresponding class attributes as pandas DataFrames.
@@ -159,20 +307,22 @@ class RevenueData:
                 func.date(GooddreamerTransaction.created_at).between(from_date, to_date)
             ).execution_options(yield_per=BATCH_SIZE)
 
-            # Stream the query results asynchronously
-            results = await self.session.stream(query)
-
-            rows = []
-            async for result in results:
-                rows.append(result._asdict())  # Convert each row to a dictionary
-            
-            self.df_coin = pd.DataFrame(rows)
+            # Stream the query results asynchronously and build the DataFrame from the row tuples,
+            # the low-cardinality columns are categoricals so equality filters compare integer codes
+            results = await (session or self.session).stream(query)
+            rows = await results.all()
+            self.df_coin = pd.DataFrame.from_records(rows, columns=list(results.keys())).astype(
+                dict.fromkeys(('source', 'status', 'payment_gateway', 'payment_channel', 'bank_code'), 'category'))
         
-        elif data == "admob_data":
-            # Asynchronously read CSV file
-            query = select(
+        elif data == "ads_data":
+            # Both reports live in the SQLite file, whose StaticPool engine serves every session from
+            # one connection, so they are read in a single UNION ALL round trip on the shared session.
+            # Columns only one report has are padded with NULL and dropped again after the split
+            admob_query = select(
+                literal("admob").label("report"),
                 AdmobReportData.date.label("Date"),
                 AdmobReportData.platform.label("Platform"),
+                null().label("Ad Placement Name"),
                 AdmobReportData.estimated_earnings.label("Estimated earnings"),
                 AdmobReportData.impressions.label("Impressions"),
                 AdmobReportData.observed_ecpm.label("Observed ECPM"),
@@ -180,89 +330,58 @@ class RevenueData:
                 AdmobReportData.clicks.label("Clicks"),
                 AdmobReportData.ad_requests.label("Ad requests"),
                 AdmobReportData.match_rate.label("Match rate"),
-                AdmobReportData.match_requests.label("Matched requests")
+                AdmobReportData.match_requests.label("Matched requests"),
+                null().label("Impression RPM")
             ).filter(
                 AdmobReportData.date.between(from_date, to_date)
-            ).execution_options(yield_per=BATCH_SIZE)
-
-            # Stream the query results asynchronously
-            results = await self.sqlite_session.stream(query)
-
-            rows = []
-            async for result in results:
-                rows.append(result._asdict())  
-
-            df = pd.DataFrame(rows)
-            if df.empty:
-                df = pd.DataFrame({
-                    "Date": pd.date_range(to_date, to_date).date,
-                    "Platform": ["-"],
-                    "Estimated earnings": [0],
-                    "Observed ECPM": [0],
-                    "Impressions": [0],
-                    "Clicks": [0],
-                    "Ad requests": [0],
-                    "Matched requests": [0],
-                    "Impression CTR": [0],
-                    "Match rate": [0],
-                    "Show rate": [0]
-                })
-
-            df["Date"] = await asyncio.to_thread(pd.to_datetime, df["Date"])
-            df["Date"] = await asyncio.to_thread(lambda: df["Date"].dt.date)
-            await asyncio.to_thread(lambda: df.sort_values(by='Date', ascending=True, inplace=True))
-            df["Estimated earnings"] = await asyncio.to_thread(lambda: df['Estimated earnings'] / 1000000)
-            df["Observed ECPM"] = await asyncio.to_thread(lambda: df['Observed ECPM'] / 1000000)
-            df['Show rate'] = await asyncio.to_thread(lambda: df['Impressions'] / df['Matched requests'])
-            await asyncio.to_thread(lambda: df.fillna(0, inplace=True))
-            df['Matched requests'] = await asyncio.to_thread(lambda: df['Matched requests'].astype(int))
-            self.df_admob = df.copy()
-        
-        elif data == "adsense_data":
-            query = select(
+            )
+            adsense_query = select(
+                literal("adsense").label("report"),
                 AdsenseReportData.date.label("Date"),
                 AdsenseReportData.platform_type_name.label("Platform"),
                 AdsenseReportData.ad_placement_name.label("Ad Placement Name"),
                 AdsenseReportData.estimated_earnings.label("Estimated earnings"),
                 AdsenseReportData.impressions.label("Impressions"),
+                null().label("Observed ECPM"),
+                AdsenseReportData.impressions_ctr.label("Impression CTR"),
                 AdsenseReportData.clicks.label("Clicks"),
                 AdsenseReportData.ad_requests.label("Ad requests"),
+                null().label("Match rate"),
                 AdsenseReportData.matched_ad_requests.label("Matched requests"),
-                AdsenseReportData.impressions_rpm.label("Impression RPM"),
-                AdsenseReportData.impressions_ctr.label("Impression CTR"),
+                AdsenseReportData.impressions_rpm.label("Impression RPM")
             ).filter(
                 AdsenseReportData.date.between(from_date, to_date)
-            ).execution_options(yield_per=BATCH_SIZE)
+            )
+            query = admob_query.union_all(adsense_query).execution_options(yield_per=BATCH_SIZE)
 
-            # Stream the query results asynchronously
-            results = await self.sqlite_session.stream(query)
+            # Stream the query results asynchronously and build the DataFrame from the row tuples
+            results = await (session or self.sqlite_session).stream(query)
+            rows = await results.all()
+            df_ads = pd.DataFrame.from_records(rows, columns=list(results.keys()))
+            report = df_ads["report"].to_numpy()
 
-            rows = []
-            async for result in results:
-                rows.append(result._asdict())  
-            
-            df = pd.DataFrame(rows)
+            df = df_ads.loc[report == "admob", _ADMOB_COLUMNS].reset_index(drop=True).infer_objects()
             if df.empty:
-                df = pd.DataFrame({
-                    "Date": pd.date_range(to_date, to_date).date,
-                    "Ad Placement name": ["-"],
-                    "Platform": ["-"],
-                    "Estimated earnings": [0],
-                    "Impression RPM": [0],
-                    "Impressions": [0],
-                    "Clicks": [0],
-                    "Ad requests": [0],
-                    "Matched requests": [0],
-                    "Impression CTR": [0],
-                    "Match rate": [0],
-                    "Show rate": [0]
-                })
-            
-            df['Date'] = await asyncio.to_thread(pd.to_datetime,df['Date'])
-            df["Date"] = await asyncio.to_thread(lambda: df["Date"].dt.date)
-            df["Match rate"] = await asyncio.to_thread(lambda: df["Matched requests"] / df["Ad requests"])
-            df["Show rate"] = await asyncio.to_thread(lambda: df["Impressions"] / df["Matched requests"])
-            self.df_adsense = df.copy()
+                df = _empty_frame(_EMPTY_ADMOB, to_date)
+
+            # One small synchronous pipeline, the dates are truncated later by `_process_date_column`
+            df = df.sort_values(by='Date', ascending=True)
+            df[["Estimated earnings", "Observed ECPM"]] = df[["Estimated earnings", "Observed ECPM"]] / 1_000_000
+            matched_requests = df['Matched requests'].to_numpy(dtype=np.float64)
+            df['Show rate'] = np.divide(
+                df['Impressions'].to_numpy(dtype=np.float64), matched_requests,
+                out=np.zeros(len(df)), where=matched_requests != 0)
+            df = df.fillna(0)
+            df['Matched requests'] = df['Matched requests'].astype(np.int64)
+            self.df_admob = df
+
+            df = df_ads.loc[report == "adsense", _ADSENSE_COLUMNS].reset_index(drop=True).infer_objects()
+            if df.empty:
+                df = _empty_frame(_EMPTY_ADSENSE, to_date)
+
+            df["Match rate"] = df["Matched requests"] / df["Ad requests"]
+            df["Show rate"] = df["Impressions"] / df["Matched requests"]
+            self.df_adsense = df
         
         elif data == "chapter_ads_data":
             query = select(
@@ -283,116 +402,85 @@ class RevenueData:
                     Sources.name
                 ).execution_options(yield_per=BATCH_SIZE)
 
-            # Stream the query results asynchronously
-            results = await self.session.stream(query)
-
-            rows = []
-            async for result in results:
-                rows.append(result._asdict())  # Convert each row to a dictionary
-            
-            df = pd.DataFrame(rows)
+            # Stream the query results asynchronously and build the DataFrame from the row tuples
+            results = await (session or self.session).stream(query)
+            rows = await results.all()
+            df = pd.DataFrame.from_records(rows, columns=list(results.keys()))
             if df.empty:
-                df = pd.DataFrame({
-                    "tanggal": pd.date_range(to_date,to_date).date,
-                    "user_id": [0],
-                    "source": ["-"],
-                    "chapter_count": [0]
-                })
-            self.df_chapter_ads = df.copy()
+                df = _empty_frame(_EMPTY_CHAPTER_ADS, to_date)
+            self.df_chapter_ads = df.astype({'source': 'category'})
 
     def _add_default_values(self, to_date: datetime.date):
         """
-        Adds default values to the DataFrame if it is empty.
+        Adds default values to the DataFrame if it is empty, once per instance.
         """
+        if self._defaults_applied:
+            return
+
         if self.df_coin.empty:
-            self.df_coin = pd.DataFrame({
-                'id': ['-'],
-                'user_id': [0],
-                "install_date": pd.date_range(to_date, to_date).date,
-                "register_date": pd.date_range(to_date, to_date),
-                "fullname": ["-"],
-                "email": ["-"],
-                "transaction_date": pd.date_range(to_date, to_date),
-                "coin_value": [0],
-                "revenue": [0],
-                "amount": [0],
-                "bank_code": [0],
-                "payment_gateway": ["-"],
-                "payment_channel": ["-"],
-                "status": ["-"],
-                "payment_date": pd.date_range(to_date, to_date).date,
-                "source": ["-"]
-            })
+            self.df_coin = _empty_frame(_EMPTY_COIN, to_date)
 
         if self.df_admob.empty:
-            self.df_admob = pd.DataFrame({
-                "Date": pd.date_range(to_date, to_date).date,
-                "Platform": ["-"],
-                "Estimated earnings": [0],
-                "Observed ECPM": [0],
-                "Impressions": [0],
-                "Clicks": [0],
-                "Ad requests": [0],
-                "Matched requests": [0],
-                "Impression CTR": [0],
-                "Match rate": [0],
-                "Show rate": [0]
-            })
+            self.df_admob = _empty_frame(_EMPTY_ADMOB, to_date)
 
         if self.df_adsense.empty:
-            self.df_adsense = pd.DataFrame({
-                "Date": pd.date_range(to_date, to_date).date,
-                "Ad Placement name": ["-"],
-                "Platform": ["-"],
-                "Estimated earnings": [0],
-                "Impression RPM": [0],
-                "Impressions": [0],
-                "Clicks": [0],
-                "Ad requests": [0],
-                "Matched requests": [0],
-                "Impression CTR": [0],
-                "Match rate": [0],
-                "Show rate": [0]
-            })
+            self.df_adsense = _empty_frame(_EMPTY_ADSENSE, to_date)
 
         if self.df_chapter_ads.empty:
-            self.df_chapter_ads = pd.DataFrame({
-                "tanggal": pd.date_range(to_date,to_date).date,
-                "user_id": [0],
-                "source": ["-"],
-                "chapter_count": [0]
-            })
+            self.df_chapter_ads = _empty_frame(_EMPTY_CHAPTER_ADS, to_date)
 
-    def _process_date_column(self):
+        self._defaults_applied = True
+
+    @staticmethod
+    def _truncate_dates(column: pd.Series, unit: str) -> np.ndarray:
         """
-        Processes date columns in the DataFrame based on the specified period.
+        Truncates a date column to the start of its day ('D') or month ('M') as datetime64 values,
+        without building a Python date object per row.
         """
-        if self.period == 'daily':
-            # Convert date columns to date format
-            self.df_coin['transaction_date'] = pd.to_datetime(self.df_coin['transaction_date']).dt.date
-            self.df_coin['register_date'] = pd.to_datetime(self.df_coin['register_date']).dt.date
-            self.df_coin['payment_date'] = pd.to_datetime(self.df_coin['payment_date']).dt.date
-            self.df_coin['install_date'] = pd.to_datetime(self.df_coin['install_date']).dt.date
-            self.df_admob["Date"] = pd.to_datetime(self.df_admob["Date"]).dt.date
-            self.df_adsense["Date"] = pd.to_datetime(self.df_adsense["Date"]).dt.date
-            self.df_chapter_ads["tanggal"] = pd.to_datetime(self.df_chapter_ads["tanggal"]).dt.date
-        else:
-            # Convert date columns to monthly period format
-            self.df_coin['transaction_date'] = pd.to_datetime(self.df_coin['transaction_date']).dt.to_period('M')
-            self.df_coin['transaction_date'] = self.df_coin['transaction_date'].dt.strftime('%Y-%m-01')
-            self.df_coin['transaction_date'] = pd.to_datetime(self.df_coin['transaction_date']).dt.date
+        return pd.to_datetime(column).to_numpy().astype(f'datetime64[{unit}]').astype('datetime64[ns]')
 
-            self.df_admob["Date"] = pd.to_datetime(self.df_admob["Date"]).dt.to_period("M")
-            self.df_admob["Date"] = self.df_admob["Date"].dt.strftime("%Y-%m-01")
-            self.df_admob["Date"] = pd.to_datetime(self.df_admob["Date"]).dt.date
+    def _process_date_column(self):
+        """
+        Processes date columns in the DataFrame based on the specified period.
 
-            self.df_adsense["Date"] = pd.to_datetime(self.df_adsense["Date"]).dt.to_period("M")
-            self.df_adsense["Date"] = self.df_adsense["Date"].dt.strftime("%Y-%m-01")
-            self.df_adsense["Date"] = pd.to_datetime(self.df_adsense["Date"]).dt.date
+        The filtered date columns stay datetime64, truncated to the day or the first of the month,
+        so they can be compared against the date range in C. The columns are only converted
+        once per instance, however many metrics are read from it.
+        """
+        if self._dates_processed:
+            return
+
+        unit = 'D' if self.period == 'daily' else 'M'
+        date_columns = (
+            (self.df_coin, 'transaction_date'),
+            (self.df_admob, 'Date'),
+            (self.df_adsense, 'Date'),
+            (self.df_chapter_ads, 'tanggal')
+        )
+        for df, column in date_columns:
+            df[column] = self._truncate_dates(df[column], unit)
 
-            self.df_chapter_ads["tanggal"] = pd.to_datetime(self.df_chapter_ads["tanggal"]).dt.to_period("M")
-            self.df_chapter_ads["tanggal"] = self.df_chapter_ads["tanggal"].dt.strftime("%Y-%m-01")
-            self.df_chapter_ads["tanggal"] = pd.to_datetime(self.df_chapter_ads["tanggal"]).dt.date
+        if self.period == 'daily':
+            # These are only displayed or compared with date objects downstream, keep them as dates
+            for column in ('register_date', 'payment_date', 'install_date'):
+                self.df_coin[column] = pd.to_datetime(self.df_coin[column]).dt.date
+
+        # Sort the frames by date once, so every date range read is a binary search and a slice
+        self.df_coin = self.df_coin.sort_values('transaction_date', kind='stable', ignore_index=True)
+        self.df_admob = self.df_admob.sort_values('Date', kind='stable', ignore_index=True)
+        self.df_adsense = self.df_adsense.sort_values('Date', kind='stable', ignore_index=True)
+        self.df_chapter_ads = self.df_chapter_ads.sort_values('tanggal', kind='stable', ignore_index=True)
+        self._dates_processed = True
+
+    @staticmethod
+    def _select(df: pd.DataFrame, column: str, start: pd.Timestamp, end: pd.Timestamp, source: str) -> pd.DataFrame:
+        """
+        Selects the rows of a frame sorted on `column` between `start` and `end` inclusive, and of
+        `source` when it is 'app' or 'web'.
+        """
+        dates = df[column].to_numpy()
+        df = df.iloc[dates.searchsorted(start.to_datetime64(), 'left'):dates.searchsorted(end.to_datetime64(), 'right')]
+        return df[df['source'] == source] if source in ["app", "web"] else df
 
     async def revenue_data(
             self, 
@@ -431,110 +519,225 @@ class RevenueData:
         Returns:
             dict: Dictionary containing the requested data based on the specified parameters.
         """
-        # Add default values and process the date column asynchronously
+        # Add default values and process the date column once, then compute the metrics off the event loop
         self._add_default_values(to_date=to_date)
         self._process_date_column()
 
-        # Intialize dataframe & filter data asynchronously based on source and date range
-        df_read = await asyncio.to_thread(
-            lambda: self.df_coin[
-                (self.df_coin["transaction_date"] >= from_date) &
-                (self.df_coin["transaction_date"] <= to_date) &
-                (self.df_coin['source'] == source)]) if source in ["app", "web"] else \
-                    await asyncio.to_thread(
-                            lambda: self.df_coin[
-                                (self.df_coin["transaction_date"] >= from_date) &
-                                (self.df_coin["transaction_date"] <= to_date)])
-        
-        df_unique_user = await asyncio.to_thread(
-            lambda: self.df_chapter_ads[
-                (self.df_chapter_ads["tanggal"] >= from_date) &
-                (self.df_chapter_ads["tanggal"] <= to_date) &
-                (self.df_chapter_ads["source"] == source)
-            ]) if source in ["app", "web"] else \
-                await asyncio.to_thread(
-                    lambda: self.df_chapter_ads[
-                        (self.df_chapter_ads["tanggal"] >= from_date) &
-                        (self.df_chapter_ads["tanggal"] <= to_date)])
-        
-        unique_user = await asyncio.to_thread(
-            lambda: df_unique_user["user_id"].nunique())
-        
-        df_admob = await asyncio.to_thread(
-            lambda: self.df_admob[
-                (self.df_admob["Date"] >= from_date) &
-                (self.df_admob["Date"] <= to_date)
-            ]
-        )
-        df_adsense = await asyncio.to_thread(
-            lambda: self.df_adsense[
-                (self.df_adsense["Date"] >= from_date) &
-                (self.df_adsense["Date"] <= to_date)
-            ]
-        )
-        df_ads = df_admob.copy() if source == "app" else df_adsense.copy()
-        
-        # Pre proccess data asynchronously
-        df_paid = await asyncio.to_thread(
-            lambda: df_read[df_read['status'] == 'paid'])
-        df_paid["transaction_date"] = await asyncio.to_thread(pd.to_datetime, df_paid["transaction_date"])
-        df_paid["day"] = await asyncio.to_thread(
-            lambda: df_paid['transaction_date'].dt.day_name())
-        df_expired = await asyncio.to_thread(
-            lambda: df_read[df_read['status'] == 'expired'])
-        df_user_purchase = await asyncio.to_thread(
-            lambda: df_paid.groupby(['user_id'])['id'].count().reset_index())
-        
-        # Calculate various metrics asynchronously using pandas operations
-        arpu = 0 if df_paid.empty else await asyncio.to_thread(lambda: int(df_paid['amount'].sum() / df_paid['user_id'].nunique()))
-        arpt = 0 if df_paid.empty else await asyncio.to_thread(lambda: int(df_paid['amount'].mean()))
-        observed_ecpm = await asyncio.to_thread(lambda: np.around(df_ads['Observed ECPM'].sum(), 2)) if source == "app" else 0
-        estimated_impressions = await asyncio.to_thread(lambda: np.around(df_ads['Estimated earnings'].sum() / df_ads['Impressions'].sum(), 2)) if df_ads['Impressions'].sum() != 0 else 0
-        revenue_per_user = await asyncio.to_thread(lambda: np.around(df_ads['Estimated earnings'].sum() / unique_user, 2)) if unique_user != 0 else 0
-        impression_per_user = await asyncio.to_thread(lambda: np.around(df_ads["Impressions"].sum() / unique_user)) if unique_user != 0 else 0
-        overall_revenue = await asyncio.to_thread(lambda: int(df_paid['amount'].sum()) + int(df_ads['Estimated earnings'].sum())) \
-            if source in ["app", "web"] else \
-                await asyncio.to_thread(lambda: int(df_paid['amount'].sum()) + int(df_admob['Estimated earnings'].sum()) + int(df_adsense['Estimated earnings'].sum()))
-        
-        metrics_data = await asyncio.gather(
-            asyncio.to_thread(lambda: df_paid['user_id'].count()), # coin_count
-            asyncio.to_thread(lambda: df_paid['user_id'].nunique()), # coin_unique
-            asyncio.to_thread(lambda: df_expired['id'].count()), # count_coin_expired
-            asyncio.to_thread(lambda: df_paid['id'].count()), # count_coin_success
-            asyncio.to_thread(lambda: df_expired['id'].count() + df_paid['id'].count()), # count_coin_total
-            asyncio.to_thread(lambda: df_paid['revenue'].sum()), # revenue
-            asyncio.to_thread(lambda: df_paid['amount'].sum()), # gross_revenue
-            asyncio.to_thread(lambda: df_user_purchase[df_user_purchase['id'] == 1]['id'].count()), # first_purchase
-            asyncio.to_thread(lambda: df_user_purchase[df_user_purchase['id'] > 1]['id'].count()), # return_purchase
-            asyncio.to_thread(lambda: np.around(df_ads['Estimated earnings'].sum(), 2)), # Estimated earnings
-            asyncio.to_thread(lambda: np.around(df_ads['Impressions'].sum(), 2)) # Impressions
-        )
+        return await asyncio.to_thread(self._revenue_metrics, from_date, to_date, metrics, source)
+
+    def _revenue_metrics(
+            self,
+            from_date: datetime.date,
+            to_date: datetime.date,
+            metrics: list,
+            source: str) -> Dict[str, float]:
+        """
+        Computes the revenue_data metrics of one date range from the processed frames.
+
+        This is plain synchronous pandas that only reads the instance frames, so several ranges
+        can run in worker threads at once.
+
+        Args:
+            from_date (datetime.date): Start date of the date range (inclusive).
+            to_date (datetime.date): End date of the date range (inclusive).
+            metrics (list): Metrics to compute, every metric when empty.
+            source (str): Source of the transactions ('app', 'web', 'all').
+
+        Returns:
+            dict: Dictionary containing the requested metrics.
+        """
+        # The loaded frames never change after processing, so a repeated range is answered from memory
+        key = (from_date, to_date, source, tuple(metrics))
+        if key in self._revenue_data_cache:
+            return dict(self._revenue_data_cache[key])
+
+        # Only compute the intermediate results the requested metrics depend on
+        needed = set().union(*(_METRIC_DEPS[m] for m in metrics)) if metrics else set().union(*_METRIC_DEPS.values())
+        container = {}
+
+        # Intialize dataframe & filter data based on source and date range
+        start, end = pd.Timestamp(from_date), pd.Timestamp(to_date)
+
+        if 'chapter_users' in needed:
+            df_unique_user = self._select(self.df_chapter_ads, "tanggal", start, end, source)
+            unique_user = df_unique_user["user_id"].nunique()
+            container['unique_user'] = int(unique_user)
+
+        if {'status', 'purchases'} & needed:
+            df_read = self._select(self.df_coin, "transaction_date", start, end, source)
+
+        if 'status' in needed:
+            # Pre proccess data, one grouped pass over status for the paid/expired aggregates
+            by_status = df_read.groupby('status', observed=True, sort=False).agg(
+                id_count=('id', 'count'),
+                amount_sum=('amount', 'sum'),
+                amount_count=('amount', 'count'),
+                revenue_sum=('revenue', 'sum')
+            )
+            by_status = by_status.set_axis(by_status.index.astype(object)).reindex(['paid', 'expired'], fill_value=0)
+            paid, expired = by_status.loc['paid'], by_status.loc['expired']
+            paid_count, expired_count = int(paid['id_count']), int(expired['id_count'])
+
+            # Calculate various metrics using pandas operations, numpy scalars are converted to int once here
+            paid_sum = paid['amount_sum']
+            paid_amount = int(paid_sum)
+            container.update({
+                'coin_count': paid_count,
+                'count_coin_expired': expired_count,
+                'count_coin_success': paid_count,
+                'count_coin_total': expired_count + paid_count,
+                'revenue': int(paid['revenue_sum']),
+                'gross_revenue': paid_amount,
+                'arpt': 0 if paid_count == 0 else int(paid_sum / paid['amount_count']),
+            })
+
+        if 'purchases' in needed:
+            paid_user_ids = df_read['user_id'].to_numpy()[(df_read['status'] == 'paid').to_numpy()]
+            coin_unique, first_purchase, return_purchase = _purchase_counts(paid_user_ids)
+            container.update({
+                'coin_unique': coin_unique,
+                'first_purchase': first_purchase,
+                'return_purchase': return_purchase,
+            })
+            if 'status' in needed:
+                container['arpu'] = 0 if paid_count == 0 else int(paid_sum / coin_unique)
+
+        if 'ads' in needed:
+            df_admob = self._select(self.df_admob, "Date", start, end, "all")
+            df_adsense = self._select(self.df_adsense, "Date", start, end, "all")
+            df_ads = df_admob if source == "app" else df_adsense
+
+            ads_earnings = df_ads['Estimated earnings'].sum()
+            ads_impressions = df_ads['Impressions'].sum()
+            observed_ecpm = np.around(df_ads['Observed ECPM'].sum(), 2) if source == "app" else 0
+            estimated_impressions = np.around(ads_earnings / ads_impressions, 2) if ads_impressions != 0 else 0
+            container.update({
+                'Estimated earnings': int(np.around(ads_earnings, 2)),
+                'Observed ECPM': int(observed_ecpm),
+                'Impressions': int(np.around(ads_impressions, 2)),
+                'Estimated_impressions': int(estimated_impressions),
+            })
+            if 'chapter_users' in needed:
+                revenue_per_user = np.around(ads_earnings / unique_user, 2) if unique_user != 0 else 0
+                impression_per_user = np.around(ads_impressions / unique_user) if unique_user != 0 else 0
+                container['revenue_per_user'] = int(revenue_per_user)
+                container['impression_per_user'] = int(impression_per_user)
+            if 'status' in needed:
+                container['overall_revenue'] = paid_amount + int(ads_earnings) \
+                    if source in ["app", "web"] else \
+                        paid_amount + int(df_admob['Estimated earnings'].sum()) + int(df_adsense['Estimated earnings'].sum())
+
+        # Emit the metrics in the requested order, or the full set in its declared order
+        container = {k: container[k] for k in (metrics or _METRIC_DEPS)}
+        self._revenue_data_cache[key] = container
         
-        container = {
-            'coin_count': int(metrics_data[0]),
-            'coin_unique': int(metrics_data[1]),
-            'count_coin_expired': int(metrics_data[2]),
-            'count_coin_success':int( metrics_data[3]),
-            'count_coin_total': int(metrics_data[4]),
-            'revenue': int(metrics_data[5]),
-            'gross_revenue': int(metrics_data[6]),
-            'arpu': int(arpu),
-            'arpt': int(arpt),
-            'first_purchase': int(metrics_data[7]),
-            'return_purchase': int(metrics_data[8]),
-            'unique_user': int(unique_user),
-            'Estimated earnings': int(metrics_data[9]),
-            'Observed ECPM': int(observed_ecpm),
-            'Impressions': int(metrics_data[10]),
-            'Estimated_impressions': int(estimated_impressions),
-            'revenue_per_user': int(revenue_per_user),
-            'impression_per_user': int(impression_per_user),
-            'overall_revenue': int(overall_revenue),
+        return dict(container)
+
+    def _build_revenue_container(
+            self,
+            df_read: pd.DataFrame,
+            df_chapter_unique_count: pd.DataFrame,
+            source: str,
+            metrics: list = []) -> Dict[str, dict]:
+        """
+        Builds the requested revenue_dataframe members from the already selected coin and chapter ads rows.
+
+        This is plain synchronous pandas so revenue_dataframe can offload it as one thread job.
+
+        Args:
+            df_read (pandas.DataFrame): Coin transactions within the date range and source.
+            df_chapter_unique_count (pandas.DataFrame): Chapter ads rows within the date range and source.
+            source (str): Source of the transactions ('app', 'web', 'all').
+            metrics (list, optional): Members to build, every member when empty.
+
+        Returns:
+            dict: Dictionary of the requested revenue_dataframe members.
+        """
+        df_paid = df_read[df_read['status'] == 'paid']
+        df_expired = df_read[df_read['status'] == 'expired']
+        df_ads = self.df_admob if source == "app" else self.df_adsense
+
+        def unique_count() -> dict:
+            df = df_chapter_unique_count.groupby("tanggal").agg(
+                chapter_admob_unique=("user_id", "nunique"),
+                chapter_admob_count=("chapter_count", "sum")
+            ).reset_index()
+            return _columns(df.assign(tanggal=df['tanggal'].dt.date))
+
+        def revenue_all_chart() -> dict:
+            # Revenue Dataframe, all sources stack admob and adsense and sum them in one groupby
+            ads_frames = [df_ads] if source in ["app", "web"] else [self.df_admob, self.df_adsense]
+            df_ads_revenue = pd.concat(
+                [frame.loc[:, ["Date", "Estimated earnings"]] for frame in ads_frames], ignore_index=True
+            ).groupby(["Date"]).agg(total_ads_revenue=("Estimated earnings", "sum")).reset_index()
+
+            df_coin_revenue = df_paid.groupby(["transaction_date"])["amount"].sum().reset_index()
+            df_coin_revenue = df_coin_revenue.rename(columns={"transaction_date": "Date"})
+
+            # Both dates are already datetime64 from _process_date_column, join on them and
+            # only turn them into date objects for the output
+            df_revenue = pd.merge(df_coin_revenue, df_ads_revenue, how="outer", on="Date")
+            amount = np.nan_to_num(df_revenue["amount"].to_numpy(dtype=np.float64)).astype(np.int64)
+            total_ads_revenue = np.nan_to_num(df_revenue["total_ads_revenue"].to_numpy(dtype=np.float64)).astype(np.int64)
+            return _columns(df_revenue.assign(
+                Date=df_revenue["Date"].dt.date,
+                amount=amount, total_ads_revenue=total_ads_revenue, total_revenue=amount + total_ads_revenue
+            ))
+
+        def total_transaksi_coin_chart() -> dict:
+            df_expired_group = df_expired.groupby(['transaction_date'])['status'].count().reset_index()
+            df_paid_group = df_paid.groupby(['transaction_date'])['status'].count().reset_index()
+            df_expired_group = df_expired_group.rename(columns={'status':'coin_expired'})
+            df_paid_group = df_paid_group.rename(columns={'status':'coin_success'})
+            df_coin_transaction = pd.merge(df_expired_group, df_paid_group, on='transaction_date', how='outer')
+            coin_expired = np.nan_to_num(df_coin_transaction['coin_expired'].to_numpy(dtype=np.float64)).astype(np.int64)
+            coin_success = np.nan_to_num(df_coin_transaction['coin_success'].to_numpy(dtype=np.float64)).astype(np.int64)
+            return _columns(df_coin_transaction.assign(
+                transaction_date=df_coin_transaction['transaction_date'].dt.date,
+                coin_expired=coin_expired, coin_success=coin_success, total_transaction=coin_expired + coin_success
+            ))
+
+        def coin_days_chart() -> dict:
+            # datetime64[D] counts days from 1970-01-01, a Thursday, so (days + 3) % 7 is 0 on Mondays
+            days = df_paid['transaction_date'].to_numpy().astype('datetime64[D]').view('int64')
+            day = pd.Categorical.from_codes(((days + 3) % 7).astype(np.int8), categories=_DAY_NAMES)
+            return _columns(df_paid.assign(day=day).groupby(['day'], observed=True).agg(
+                total_pembelian=('id', 'count')
+            ).reset_index())
+
+        def payment_channel() -> dict:
+            df_channel = df_paid.loc[:, ['id', 'payment_channel', 'bank_code']]
+            channel = df_channel['payment_channel'].str.replace('"', '', regex=False).to_numpy()
+            df_channel['payment_channel'] = np.where(
+                channel == 'bank_transfer', df_channel['bank_code'].to_numpy(), channel)
+            return _columns(df_channel.groupby(['payment_channel']).agg(
+                total_transaksi=('id', 'count')
+            ).reset_index().sort_values(by='total_transaksi', ascending=False))
+
+        # Each member is built only when it is requested
+        members = {
+            'df_unique_count': unique_count,
+            'df_ads': lambda: _columns(df_ads.assign(Date=df_ads['Date'].dt.date)),
+            'dataframe': lambda: _columns(df_read.assign(transaction_date=df_read['transaction_date'].dt.date)),
+            'cost_revenue': lambda: _columns(df_paid.groupby(['transaction_date']).agg(
+                total_rev_koin=('amount', 'sum')
+            ).rename_axis(index={'transaction_date':'date_start'}).reset_index()),
+            'revenue_all_chart': revenue_all_chart,
+            'total_transaksi_coin_chart': total_transaksi_coin_chart,
+            'category_coin_chart': lambda: _columns(df_paid.groupby(['coin_value']).agg(
+                total_pembelian=('id', 'count')
+            ).reset_index()),
+            'revenue_days': lambda: _columns(df_paid.groupby(['transaction_date']).agg(
+                total_revenue=('amount', 'sum')
+            ).rename_axis(index={'transaction_date':'date'}).reset_index()),
+            'coin_days_chart': coin_days_chart,
+            'old_new_df': lambda: _columns(df_paid.loc[:, ['transaction_date', 'user_id', 'email', 'fullname', 'install_date']].rename(
+                columns={'transaction_date':'buy_date', 'install_date':'created_at'}
+            )),
+            'payment_channel': payment_channel,
         }
+        container = {k: members[k]() for k in (metrics or members)}
 
-        if metrics:
-            container = {k: container[k] for k in metrics}
-        
         return container
 
     async def revenue_dataframe(
@@ -551,7 +754,6 @@ class RevenueData:
             from_date (str): Start date of the date range (inclusive), format: 'YYYY-MM-DD'.
             to_date (str): End date of the date range (inclusive), format: 'YYYY-MM-DD'.
             metrics (list, optional): Filtering metrics to fetch
-                - 'dataframe'
                 - 'df_unique_count'
                 - 'df_ads'
                 - 'dataframe'
@@ -572,135 +774,13 @@ class RevenueData:
         self._add_default_values(to_date=to_date)
         self._process_date_column()
 
-        # Initiate the data & filtering data asynchronously
-        self.df_coin["transaction_date"] = await asyncio.to_thread(pd.to_datetime, self.df_coin["transaction_date"])
-        self.df_coin["transaction_date"]  = await asyncio.to_thread(lambda: self.df_coin["transaction_date"].dt.date)
-        df_read = await asyncio.to_thread(
-            lambda: self.df_coin[
-                (self.df_coin["transaction_date"] >= from_date) &
-                (self.df_coin["transaction_date"] <= to_date) &
-                (self.df_coin['source'] == source)]) if source in ["app", "web"] else \
-                    await asyncio.to_thread(
-                        lambda: self.df_coin[
-                            (self.df_coin["transaction_date"] >= from_date) &
-                            (self.df_coin["transaction_date"] <= to_date)])
-        
-        df_chapter_unique_count = await asyncio.to_thread(
-            lambda: self.df_chapter_ads[
-                (self.df_chapter_ads["tanggal"] >= from_date) &
-                (self.df_chapter_ads["tanggal"] <= to_date) &
-                (self.df_chapter_ads["source"] == source)
-            ]) if source in ["app", "web"] else \
-                await asyncio.to_thread(
-                    lambda: self.df_chapter_ads[
-                        (self.df_chapter_ads["tanggal"] >= from_date) &
-                        (self.df_chapter_ads["tanggal"] <= to_date)])
+        # Initiate the data & filter it by source and date range
+        start, end = pd.Timestamp(from_date), pd.Timestamp(to_date)
+        df_read = self._select(self.df_coin, "transaction_date", start, end, source)
+        df_chapter_unique_count = self._select(self.df_chapter_ads, "tanggal", start, end, source)
         
-        df_chapter_unique_count = await asyncio.to_thread(
-            lambda: df_chapter_unique_count.groupby("tanggal").agg(
-                chapter_admob_unique=("user_id", "nunique"),
-                chapter_admob_count=("chapter_count", "sum")
-            ).reset_index())
-
-        df_paid = await asyncio.to_thread(lambda: df_read[df_read['status'] == 'paid'])
-        df_paid["transaction_date"] = await asyncio.to_thread(pd.to_datetime, df_paid["transaction_date"])
-        df_paid['day'] = await asyncio.to_thread(lambda: df_paid['transaction_date'].dt.day_name())
-        df_expired = await asyncio.to_thread(lambda: df_read[df_read['status'] == 'expired'])
-        df_ads = self.df_admob if source == "app" else self.df_adsense
-
-        # Revenue Dataframe
-        df_admob = await asyncio.to_thread(lambda: self.df_admob.loc[:, ["Date", "Estimated earnings"]])
-        df_admob = await asyncio.to_thread( 
-            lambda: df_admob.groupby(["Date"]).agg(
-                admob_revenue=("Estimated earnings", "sum")
-            ).reset_index())
-        df_adsense = await asyncio.to_thread(lambda: self.df_adsense.loc[:, ["Date", "Estimated earnings"]])
-        df_adsense = await asyncio.to_thread(
-            lambda: df_adsense.groupby(["Date"]).agg(
-                adsense_revenue=("Estimated earnings", "sum")
-            ).reset_index())
-        
-        df_admob["Date"] = await asyncio.to_thread(pd.to_datetime, df_admob["Date"])
-        df_admob["Date"] = await asyncio.to_thread(lambda: df_admob["Date"].dt.date)
-        df_adsense["Date"] = await asyncio.to_thread(pd.to_datetime, df_adsense["Date"])
-        df_adsense["Date"] = await asyncio.to_thread(lambda: df_adsense["Date"].dt.date)
-        df_ads_revenue = await asyncio.to_thread(lambda: pd.merge(df_admob, df_adsense, how="outer", on="Date"))
-
-        await asyncio.to_thread(lambda: df_ads_revenue.fillna(0, inplace=True))
-        await asyncio.to_thread(lambda: df_ads_revenue.infer_objects(copy=True))
-
-        df_ads_revenue["total_ads_revenue"] = await asyncio.to_thread(lambda: df_ads_revenue["admob_revenue"] + df_ads_revenue["adsense_revenue"])
-        df_ads_revenue = await asyncio.to_thread(lambda: df_ads_revenue.loc[:, ["Date", "total_ads_revenue"]]) \
-            if source not in ["app", "web"] else \
-                await asyncio.to_thread(lambda: df_ads.groupby(["Date"]).agg(total_ads_revenue=("Estimated earnings", "sum")).reset_index())
-        
-        df_coin_revenue = await asyncio.to_thread(lambda: df_paid.groupby(["transaction_date"])["amount"].sum().reset_index())
-        await asyncio.to_thread(lambda: df_coin_revenue.rename(columns={"transaction_date": "Date"}, inplace=True))
-        
-        df_coin_revenue["Date"] = await asyncio.to_thread(pd.to_datetime, df_coin_revenue["Date"])
-        df_coin_revenue["Date"] = await asyncio.to_thread(lambda: df_coin_revenue["Date"].dt.date)
-        df_ads_revenue["Date"] = await asyncio.to_thread(pd.to_datetime, df_ads_revenue["Date"])
-        df_ads_revenue["Date"] = await asyncio.to_thread(lambda: df_ads_revenue["Date"].dt.date)
-
-        df_revenue = await asyncio.to_thread(lambda: pd.merge(df_coin_revenue, df_ads_revenue, how="outer", on="Date"))
-        await asyncio.to_thread(lambda: df_revenue.fillna(0, inplace=True))
-        await asyncio.to_thread(lambda: df_revenue.infer_objects(copy=True))
-        df_revenue["amount"] = await asyncio.to_thread(lambda: df_revenue["amount"].astype(int))
-        df_revenue["total_ads_revenue"] = await asyncio.to_thread(lambda: df_revenue["total_ads_revenue"].astype(int))
-        df_revenue["total_revenue"] = await asyncio.to_thread(lambda: df_revenue["amount"] + df_revenue["total_ads_revenue"])
-        
-        # dataframe coin transaction
-        df_expired_group =await asyncio.to_thread(lambda:  df_expired.groupby(['transaction_date'])['status'].count().reset_index())
-        await asyncio.to_thread(lambda: df_expired_group.rename(columns={'status':'coin_expired'}, inplace=True))
-        df_paid_group = await asyncio.to_thread(lambda: df_paid.groupby(['transaction_date'])['status'].count().reset_index())
-        await asyncio.to_thread(lambda: df_paid_group.rename(columns={'status':'coin_success'}, inplace=True))
-        df_expired_group["transaction_date"] = await asyncio.to_thread(pd.to_datetime, df_expired_group["transaction_date"])
-        df_expired_group["transaction_date"] = await asyncio.to_thread(lambda: df_expired_group["transaction_date"].dt.date)
-        df_paid_group["transaction_date"] = await asyncio.to_thread(pd.to_datetime, df_paid_group["transaction_date"])
-        df_paid_group["transaction_date"] = await asyncio.to_thread(lambda: df_paid_group["transaction_date"].dt.date)
-        df_coin_transaction = await asyncio.to_thread(lambda: pd.merge(df_expired_group, df_paid_group, on='transaction_date', how='outer'))
-        await asyncio.to_thread(lambda: df_coin_transaction.fillna(0, inplace=True))
-        df_coin_transaction['coin_expired'] = await asyncio.to_thread(lambda: df_coin_transaction['coin_expired'].astype(int))
-        df_coin_transaction['coin_success'] = await asyncio.to_thread(lambda: df_coin_transaction['coin_success'].astype(int))
-        df_coin_transaction['total_transaction'] = await asyncio.to_thread(lambda: df_coin_transaction['coin_expired'] + df_coin_transaction['coin_success'])
-
-        # dataframe payment channel
-        df_channel = await asyncio.to_thread(lambda: df_paid.loc[:, ['id', 'payment_channel', 'bank_code']])
-        df_channel['payment_channel'] = await asyncio.to_thread(lambda: df_channel['payment_channel'].str.replace('"', ''))
-        df_channel['payment_channel'] = await asyncio.to_thread( 
-            lambda: df_channel.apply(lambda row: row['bank_code'] if row['payment_channel'] == 'bank_transfer' else row['payment_channel'], axis=1))
-        
-        container = {
-            'dataframe': df_read.copy(),
-            'df_unique_count': df_chapter_unique_count.to_dict(),
-            'df_ads': df_ads.to_dict(),
-            'dataframe': df_read.to_dict(),
-            'cost_revenue': df_paid.groupby(['transaction_date']).agg(
-                total_rev_koin=('amount', 'sum')
-            ).rename_axis(index={'transaction_date':'date_start'}).reset_index().to_dict(),
-            'revenue_all_chart': df_revenue.to_dict(),
-            'total_transaksi_coin_chart': df_coin_transaction.to_dict(),
-            'category_coin_chart': df_paid.groupby(['coin_value']).agg(
-                total_pembelian=('id', 'count')
-            ).reset_index().to_dict(),
-            'revenue_days': df_paid.groupby(['transaction_date']).agg(
-                total_revenue=('amount', 'sum')
-            ).rename_axis(index={'transaction_date':'date'}).reset_index().to_dict(),
-            'coin_days_chart': df_paid.groupby(['day']).agg(
-                total_pembelian=('id', 'count')
-            ).reset_index().to_dict(),
-            'old_new_df': df_paid.loc[:, ['transaction_date', 'user_id', 'email', 'fullname', 'install_date']].rename(
-                columns={'transaction_date':'buy_date', 'install_date':'created_at'}
-            ).to_dict(),
-            'payment_channel': df_channel.groupby(['payment_channel']).agg(
-                total_transaksi=('id', 'count')
-            ).reset_index().sort_values(by='total_transaksi', ascending=False).to_dict(),
-        }
-
-        if metrics:
-            container = {k: container[k] for k in metrics}
-        
-        return container
+        return await asyncio.to_thread(
+            self._build_revenue_container, df_read, df_chapter_unique_count, source, metrics)
 
     async def daily_growth(
             self,
@@ -749,28 +829,20 @@ class RevenueData:
         fromdate_lastweek = from_date - delta
         todate_lastweek = to_date - delta
         
-        # Fetch data for the current and previous week
-        current_data = await self.revenue_data(from_date=from_date, to_date=to_date, source=source, metrics=metrics)
-        last_week_data = await self.revenue_data(from_date=fromdate_lastweek, to_date=todate_lastweek, source=source, metrics=metrics)
+        # Prepare the frames once, then compute the current and previous week in two worker threads
+        self._add_default_values(to_date=to_date)
+        self._process_date_column()
+        current_data, last_week_data = await asyncio.gather(
+            asyncio.to_thread(self._revenue_metrics, from_date, to_date, metrics, source),
+            asyncio.to_thread(self._revenue_metrics, fromdate_lastweek, todate_lastweek, metrics, source)
+        )
         
         # Check if both datasets have the same keys
         if set(current_data.keys()) != set(last_week_data.keys()):
             raise ValueError("Data from different periods must have the same keys")
 
         # Calculate daily growth percentage
-        growth_percentage = {}
-        for key in current_data:
-            old_value = last_week_data[key]
-            new_value = current_data[key]
-
-            if old_value == 0:
-                percentage = 0
-            else:
-                percentage = (new_value - old_value) / old_value
-        
-            growth_percentage[key] = round(percentage, ndigits=4)
-        
-        return growth_percentage
+        return calculate_growth_percentage(current_data, last_week_data)
 
 
 async def returning_first_purchase(
@@ -833,47 +905,36 @@ async def returning_first_purchase(
                 GooddreamerTransaction.transaction_status == 1
             ).subquery()
 
-        # Subqueries for first and returning purchases
-        first_purchase_subquery = select(
-                func.date_format(transaction_subquery.c.date, date_format).label('period'),
-                func.count(transaction_subquery.c.user_id.distinct()).label('first_purchase')
-            ).filter(
-                transaction_subquery.c.user_types == 'first_purchase'
-            ).group_by(
-                'period'
-            ).subquery()
+        # Distinct buyers of each type, counted in one pass over the transactions
+        first_purchase_count = func.count(Case(
+            (transaction_subquery.c.user_types == 'first_purchase', transaction_subquery.c.user_id)
+        ).distinct())
+        returning_purchase_count = func.count(Case(
+            (transaction_subquery.c.user_types == 'returning_purchase', transaction_subquery.c.user_id)
+        ).distinct())
+
+        if data != "df":
+            # Only the totals are requested, skip the per period query
+            result = await session.execute(select(first_purchase_count, returning_purchase_count))
+            first_purchase_result, returning_purchase_result = result.one()
+            return {
+                'first_purchase': first_purchase_result,
+                'returning_purchase': returning_purchase_result
+            }
 
-        returning_purchase_subquery = select(
+        # Both purchase types per period, in a single grouped query
+        main_query = select(
                 func.date_format(transaction_subquery.c.date, date_format).label('period'),
-                func.count(transaction_subquery.c.user_id.distinct()).label('returning_purchase')
-            ).filter(
-                transaction_subquery.c.user_types == 'returning_purchase'
+                first_purchase_count.label('first_purchase'),
+                returning_purchase_count.label('returning_purchase')
             ).group_by(
                 'period'
-            ).subquery()
-        
-
-        # Main query combining first and returning purchases
-        main_query = select(
-                first_purchase_subquery.c.period.label('period'),
-                first_purchase_subquery.c.first_purchase.label('first_purchase'),
-                returning_purchase_subquery.c.returning_purchase.label('returning_purchase')
-            ).outerjoin(
-                returning_purchase_subquery, first_purchase_subquery.c.period == returning_purchase_subquery.c.period
-            ).distinct().union_all(
-                select(
-                    returning_purchase_subquery.c.period.label('period'),
-                    first_purchase_subquery.c.first_purchase.label('first_purchase'),
-                    returning_purchase_subquery.c.returning_purchase.label('returning_purchase')
-                ).outerjoin(
-                    first_purchase_subquery, returning_purchase_subquery.c.period == first_purchase_subquery.c.period
-                ).distinct()
             ).order_by(asc('period'))
 
         # Execute the main query asynchronously
         result = await session.execute(main_query)
         rows = result.all()
-        df = pd.DataFrame(rows, columns=['period', 'first_purchase', 'returning_purchase']).drop_duplicates()
+        df = pd.DataFrame(rows, columns=['period', 'first_purchase', 'returning_purchase'])
         
         if df.empty:
             # Handle the case where no data is found
@@ -884,23 +945,7 @@ async def returning_first_purchase(
             }
             df = pd.DataFrame(default_value, index=[0])
 
-        # Prepare the result
-        first_purchase_result = await session.scalar(
-            select(func.count(transaction_subquery.c.user_id.distinct()))
-            .filter(transaction_subquery.c.user_types == 'first_purchase')
-        )
-
-        returning_purchase_result = await session.scalar(
-            select(func.count(transaction_subquery.c.user_id.distinct()))
-            .filter(transaction_subquery.c.user_types == 'returning_purchase')
-        )
-        
-        result_dict = {
-            'first_purchase': first_purchase_result,
-            'returning_purchase': returning_purchase_result
-        }
-
-        return result_dict if data != "df" else df.copy()
+        return df
     except Exception as e:
         return f"An error occurred: {e}"
 
@@ -942,19 +987,7 @@ async def dg_returning_first_purchase(
             raise ValueError("Data from different periods must have the same keys")
 
         # Calculate daily growth percentage
-        growth_percentage = {}
-        for key in current_data:
-            old_value = last_week_data[key]
-            new_value = current_data[key]
-
-            if old_value == 0:
-                percentage = 0
-            else:
-                percentage = (new_value - old_value) / old_value
-                
-            growth_percentage[key] = round(percentage, ndigits=4)
-
-        return growth_percentage
+        return calculate_growth_percentage(current_data, last_week_data)
 
     except Exception as e:
         return f"Error : {e}"
@@ -991,14 +1024,14 @@ async def total_transaksi_coin(
     # Create a Plotly bar chart
     fig = go.Figure(data=[
         go.Bar(name='Expired Coin Transaction', x=df['transaction_date'], y=df['coin_expired'],
-               marker=dict(color='red'), text=df['coin_expired'].apply(lambda x: "{:,.0f}".format((x))), textposition='inside'),
+               marker=dict(color='red'), texttemplate='%{y:,.0f}', textposition='inside'),
         go.Bar(name='Success Coin Transaction', x=df['transaction_date'], y=df['coin_success'],
-               marker=dict(color='green'), text=df['coin_success'].apply(lambda x: "{:,.0f}".format((x))), textposition='inside')]
+               marker=dict(color='green'), texttemplate='%{y:,.0f}', textposition='inside')]
     )
 
     # Update layout of the chart
     fig.update_xaxes(autorange=True, title='Date', dtick='D1' if period == "daily" else "M1")
-    if df['transaction_date'].count() >= 31:
+    if len(df) >= 31:
         fig.update_xaxes(autorange=True, title='Date', dtick='M1')
     fig.update_yaxes(title='Coin Transaction')
     fig.add_traces(go.Scatter(x=df['transaction_date'], y=df['total_transaction'],
@@ -1013,7 +1046,7 @@ async def total_transaksi_coin(
         ))
 
     # Convert chart to JSON
-    chart = await asyncio.to_thread(json.dumps, fig, cls=plotly.utils.PlotlyJSONEncoder)
+    chart = await asyncio.to_thread(figure_to_json, fig)
 
     return chart
 
@@ -1046,18 +1079,18 @@ async def transaksi_koin(
         # Group data by month
         df_full_merged["date"] = await asyncio.to_thread(pd.to_datetime, df_full_merged["date"], format="%Y-%m-01")
         df_full_merged['date'] = await asyncio.to_thread(lambda: df_full_merged['date'].dt.date)
-        df_group = await asyncio.to_thread(lambda: df_full_merged.groupby(['date'])['transaksi_sukses'].sum().reset_index())
-        df_group_1 = await asyncio.to_thread(lambda: df_full_merged.groupby(['date'])['transaksi_gagal'].sum().reset_index())
-        df_group_2 = await asyncio.to_thread(lambda: df_full_merged.groupby(['date'])['total_transaksi'].sum().reset_index())
-        df_merge = await asyncio.to_thread(lambda: pd.merge(df_group, df_group_1, how='outer', on='date'))
-        df_full_merged = await asyncio.to_thread(lambda: pd.merge(df_group_2, df_merge, how='outer', on='date'))
-        df_full_merged['date'] = await asyncio.to_thread(lambda: df_full_merged['date'].astype(str))
-        df_full_merged['date'] = await asyncio.to_thread(pd.to_datetime, df_full_merged['date'])
-        df_full_merged["date"] = await asyncio.to_thread(lambda: df_full_merged["date"].dt.date)
+        df_full_merged = await asyncio.to_thread(
+            lambda: df_full_merged.groupby('date', as_index=False).agg(
+                total_transaksi=('total_transaksi', 'sum'),
+                transaksi_sukses=('transaksi_sukses', 'sum'),
+                transaksi_gagal=('transaksi_gagal', 'sum')
+            ))
 
     # Calculate success rate and expired rate
-    df_full_merged['success_rate'] = await asyncio.to_thread(lambda: df_full_merged['transaksi_sukses'] / df_full_merged['total_transaksi'])
-    df_full_merged['expired_rate'] = await asyncio.to_thread(lambda: df_full_merged['transaksi_gagal'] / df_full_merged['total_transaksi'])
+    total_transaksi = df_full_merged['total_transaksi'].to_numpy(dtype=np.float64)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        df_full_merged['success_rate'] = df_full_merged['transaksi_sukses'].to_numpy() / total_transaksi
+        df_full_merged['expired_rate'] = df_full_merged['transaksi_gagal'].to_numpy() / total_transaksi
 
     return df_full_merged
 
@@ -1079,10 +1112,8 @@ async def persentase_koin_gagal_sukses(
     df = await transaksi_koin(revenue_data=revenue_data, period=period)
 
     # If there are more than 30 data points, use 'all_time' period for better visualization
-    if df['date'].count() > 30:
+    if len(df) > 30:
         df = await transaksi_koin(revenue_data=revenue_data, period='all_time')
-    else:
-        df = await transaksi_koin(revenue_data=revenue_data, period=period)
 
     await asyncio.to_thread(lambda: df.sort_values(by='date', ascending=True, inplace=True))
     
@@ -1133,13 +1164,13 @@ async def persentase_koin_gagal_sukses(
     if period == 'all_time':
         fig.update_xaxes(title='Date', dtick='M1')
     else:
-        if df['date'].count() > 7:
+        if len(df) > 7:
             fig.update_xaxes(title='Date', dtick='M1')
         else:
             fig.update_xaxes(title='Date', dtick='D1')
 
     
-    chart = await asyncio.to_thread(json.dumps, fig, cls=plotly.utils.PlotlyJSONEncoder)
+    chart = await asyncio.to_thread(figure_to_json, fig)
 
     return chart
 
@@ -1171,7 +1202,7 @@ async def category_coin(revenue_data: Dict) -> str:
     fig = go.Figure(
         go.Bar(y=category_df.coin_value,
                x=category_df.total_pembelian, orientation='h',
-               text=category_df['total_pembelian'].apply(lambda x: "{:,.0f}".format((x))), textposition='inside',
+               texttemplate='%{x:,.0f}', textposition='inside',
                marker=dict(showscale=True, colorscale='bluered_r', color=category_df.total_pembelian))
     )
 
@@ -1181,7 +1212,7 @@ async def category_coin(revenue_data: Dict) -> str:
     fig.update_yaxes(title='Coin Value')
 
     # Convert chart to JSON
-    chart = await asyncio.to_thread(json.dumps, fig, cls=plotly.utils.PlotlyJSONEncoder)
+    chart = await asyncio.to_thread(figure_to_json, fig)
 
     return chart
 
@@ -1216,7 +1247,7 @@ async def revenue_days(
     plot = go.Bar(
         x=revenue_df.date, 
         y=revenue_df.total_revenue, 
-        text=revenue_df.total_revenue.apply(lambda x: "Rp. {:,f}".format(x)), 
+        texttemplate='Rp. %{y:,f}', 
         textposition='inside') if chart_types == "bar" else \
             go.Scatter(
                 x=revenue_df.date, 
@@ -1229,14 +1260,14 @@ async def revenue_days(
     # Update layout of the chart
     fig.update_layout(title='Total Revenue Per Days' if chart_types == "line" else "Total Revenue per Month")
     fig.update_xaxes(title='Months', dtick='D1' if chart_types == "line" else "M1")
-    if revenue_df['date'].count() >= 31:
+    if len(revenue_df) >= 31:
         fig.update_xaxes(title='Months', dtick='M1')
     fig.update_yaxes(title='Total Revenue')
     if chart_types == "line":
         fig.update_traces(text=revenue_df.total_revenue, textposition='top center')
 
     # Convert chart to JSON
-    chart = await asyncio.to_thread(json.dumps, fig, cls=plotly.utils.PlotlyJSONEncoder)
+    chart = await asyncio.to_thread(figure_to_json, fig)
 
     return chart
 
@@ -1268,7 +1299,7 @@ async def coin_days(
 
     # Create a Plotly bar chart
     fig = go.Figure(
-        go.Bar(y=df.total_pembelian, x=df.day, text=df['total_pembelian'].apply(lambda x: "{:,.0f}".format((x))), textposition='inside',
+        go.Bar(y=df.total_pembelian, x=df.day, texttemplate='%{y:,.0f}', textposition='inside',
                marker=dict(showscale=True, colorscale='emrld', color=df.total_pembelian))
     )
 
@@ -1280,7 +1311,7 @@ async def coin_days(
     fig.update_yaxes(title='Total Coin Transaction')
 
     # Convert chart to JSON
-    chart = await asyncio.to_thread(json.dumps, fig, cls=plotly.utils.PlotlyJSONEncoder)
+    chart = await asyncio.to_thread(figure_to_json, fig)
 
     return chart
 
@@ -1333,7 +1364,7 @@ async def transaksi_koin_details(
     
     # Apply filters if provided
     if filters == '':
-        df_filter = df.copy()
+        df_filter = df
     else:
         df_filter = await asyncio.to_thread(lambda: df[df['status'] == filters])
     
@@ -1357,7 +1388,7 @@ async def transaksi_koin_details(
     fig.update_layout(title='Coin Transaction Details')
 
     # Convert table to JSON
-    chart = await asyncio.to_thread(json.dumps, fig, cls=plotly.utils.PlotlyJSONEncoder)
+    chart = await asyncio.to_thread(figure_to_json, fig)
     
     return chart
 
@@ -1437,12 +1468,12 @@ async def old_new_user_pembeli_koin_chart(
     # Update layout of the chart
     fig.update_layout(title='Old & New Coin Purchaser')
     fig.update_xaxes(title='Date', dtick='D1')
-    if df['buy_date'].count() >= 31:
+    if len(df) >= 31:
         fig.update_xaxes(title='Date', dtick='M1')
     fig.update_yaxes(title='Value')
 
     # Convert chart to JSON
-    chart = await asyncio.to_thread(json.dumps, fig, cls=plotly.utils.PlotlyJSONEncoder)
+    chart = await asyncio.to_thread(figure_to_json, fig)
 
     return chart
 
@@ -1522,7 +1553,7 @@ async def chart_returning_first_purchase(
             )
         )
 
-        chart = await asyncio.to_thread(json.dumps, fig, cls=plotly.utils.PlotlyJSONEncoder)
+        chart = await asyncio.to_thread(figure_to_json, fig)
 
         return chart
 
@@ -1603,7 +1634,7 @@ async def unique_count_users_admob(
     else:
         fig.update_xaxes(dtick='D1')
 
-    chart = await asyncio.to_thread(json.dumps, fig, cls=plotly.utils.PlotlyJSONEncoder)
+    chart = await asyncio.to_thread(figure_to_json, fig)
 
     return chart
 
@@ -1659,7 +1690,7 @@ async def impression_revenue_chart(revenue_data: Dict, period: str = "daily") ->
         )
         fig.update_xaxes(dtick='D1' if period == "daily" else "M1") 
 
-        return await asyncio.to_thread(json.dumps, fig, cls=plotly.utils.PlotlyJSONEncoder)
+        return await asyncio.to_thread(figure_to_json, fig)
 
     except Exception as e:
         return json.dumps({'error': f'An error occurred while generating the chart, {e}'})
@@ -1721,7 +1752,7 @@ async def ads_details(
             title='Ads Details',
             autosize=True,  # Adjust table size automatically for better fit
         )
-        chart = await asyncio.to_thread(json.dumps, fig, cls=plotly.utils.PlotlyJSONEncoder)
+        chart = await asyncio.to_thread(figure_to_json, fig)
         return chart
 
     except Exception as e:
@@ -1855,7 +1886,7 @@ async def frequency_distribution_admob_df(
                 xaxis_title='Frequency Distribution Group',
                 yaxis_title='User Count'
             )
-            chart = await asyncio.to_thread(json.dumps, fig, cls=plotly.utils.PlotlyJSONEncoder)
+            chart = await asyncio.to_thread(figure_to_json, fig)
             return chart
         else:
             return df
@@ -1910,7 +1941,7 @@ async def frequency_admob_table(
             autosize=True,  # Auto-adjust table size
             # Additional layout options as needed
         )
-        chart = await asyncio.to_thread(json.dumps, fig, cls=plotly.utils.PlotlyJSONEncoder)
+        chart = await asyncio.to_thread(figure_to_json, fig)
         return chart
 
     except Exception as e:  # Catch any unexpected errors
@@ -1985,6 +2016,6 @@ async def revenue_all_chart(
     else:
         fig.update_xaxes(dtick='D1')
 
-    chart = await asyncio.to_thread(json.dumps, fig, cls=plotly.utils.PlotlyJSONEncoder)
+    chart = await asyncio.to_thread(figure_to_json, fig)
 
     return chart
@@ -1,12 +1,11 @@
 from datetime import datetime, timedelta
 import pandas as pd
-import json
-import plotly
 import plotly.graph_objects as go
 import asyncio
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 from app.db.models.acquisition import GoogleAdsData, FacebookAdsData
+from app.utils.common_utils import figure_to_json
 
 
 async def df_file(
@@ -238,7 +237,7 @@ async def spend_chart(
     fig.update_yaxes(title='Spend')
 
     # Convert chart to JSON format
-    chart = await asyncio.to_thread(json.dumps, fig, cls=plotly.utils.PlotlyJSONEncoder)
+    chart = await asyncio.to_thread(figure_to_json, fig)
 
     return chart
 
@@ -360,7 +359,7 @@ async def metrics_chart(
     fig.update_xaxes(title='Date', dtick='D1')
 
     # Convert chart to JSON format
-    chart = await asyncio.to_thread(json.dumps, fig, cls=plotly.utils.PlotlyJSONEncoder)
+    chart = await asyncio.to_thread(figure_to_json, fig)
 
     return chart
 
@@ -438,6 +437,6 @@ async def details_table(
     fig.update_layout(title=f'{sources} {name} Table')
 
     # Convert chart to JSON format
-    chart = await asyncio.to_thread(json.dumps, fig, cls=plotly.utils.PlotlyJSONEncoder)
+    chart = await asyncio.to_thread(figure_to_json, fig)
 
     return chart
@@ -1,8 +1,6 @@
 """seo function file"""
 from datetime import datetime, timedelta
 import pandas as pd
-import json
-import plotly
 import plotly.graph_objects as go
 import re
 import warnings
@@ -10,6 +8,7 @@ import asyncio
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 from app.db.models.acquisition import Ga4AnalyticsData, Ga4LandingPageData
+from app.utils.common_utils import figure_to_json
 warnings.simplefilter(action='ignore', category=FutureWarning)
 
 
@@ -309,7 +308,7 @@ async def ga4_metrics_chart(
     fig.update_xaxes(dtick='D1')
 
     # Convert the figure to JSON format
-    chart = await asyncio.to_thread(json.dumps, fig, cls=plotly.utils.PlotlyJSONEncoder)
+    chart = await asyncio.to_thread(figure_to_json, fig)
 
     return chart
 
@@ -349,7 +348,7 @@ async def ga4_source_chart(
     fig.update_layout(title='Sessions Source')
 
     # Convert the figure to JSON format
-    chart = await asyncio.to_thread(json.dumps, fig, cls=plotly.utils.PlotlyJSONEncoder)
+    chart = await asyncio.to_thread(figure_to_json, fig)
 
     return chart
 
@@ -386,7 +385,7 @@ async def ga4_device_chart(
     fig.update_layout(title='Platform')
 
     # Convert the figure to JSON format
-    chart = await asyncio.to_thread(json.dumps, fig, cls=plotly.utils.PlotlyJSONEncoder)
+    chart = await asyncio.to_thread(figure_to_json, fig)
 
     return chart
 
@@ -474,7 +473,7 @@ async def landing_page_tbl(
         fig.update_layout(title='Top 10 Landing Page By CPC ')
 
     # Convert the figure to JSON format
-    chart = await asyncio.to_thread(json.dumps, fig, cls=plotly.utils.PlotlyJSONEncoder)
+    chart = await asyncio.to_thread(figure_to_json, fig)
 
     return chart
 
@@ -593,7 +592,7 @@ async def ranking_chart():
     fig.update_yaxes(title='Value')
 
     # Convert figure to JSON string
-    chart = await asyncio.to_thread(json.dumps, fig, cls=plotly.utils.PlotlyJSONEncoder)
+    chart = await asyncio.to_thread(figure_to_json, fig)
 
     return chart
 
@@ -671,6 +670,6 @@ async def web_traffic_table(
     fig.update_layout(title='Web Traffic Details')
 
     # Convert figure to JSON string
-    chart = await asyncio.to_thread(json.dumps, fig, cls=plotly.utils.PlotlyJSONEncoder)
+    chart = await asyncio.to_thread(figure_to_json, fig)
 
     return chart
@@ -1,6 +1,4 @@
 import pandas as pd
-import json
-import plotly
 import plotly.graph_objects as go
 import asyncio
 from datetime import datetime, timedelta
@@ -12,6 +10,7 @@ from app.db.models.data_source import ModelHasSources as mhs, Sources as s
 from app.db.models.novel import GooddreamerUserChapterProgression as gucp, GooddreamerChapterTransaction as gct
 from app.db.models.novel import GooddreamerUserChapterAdmob as guca
 from app.db.models.coin import GooddreamerTransaction as gt
+from app.utils.common_utils import figure_to_json
 
 
 # Define a function to convert decimal hours to timedelta
@@ -569,7 +568,7 @@ async def heatmap_table(
     )
 
     # Return the table as a JSON object
-    chart = await asyncio.to_thread(json.dumps, fig, cls=plotly.utils.PlotlyJSONEncoder)
+    chart = await asyncio.to_thread(figure_to_json, fig)
     return chart
 
 
@@ -650,6 +649,6 @@ async def ga4_session(
     fig.update_layout(title='Average User Engagement Time By Minutes')
     fig.update_yaxes(title="Minute")
     
-    chart = await asyncio.to_thread(json.dumps, fig, cls=plotly.utils.PlotlyJSONEncoder)
+    chart = await asyncio.to_thread(figure_to_json, fig)
     
     return chart